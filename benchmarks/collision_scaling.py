@@ -0,0 +1,121 @@
+"""How the bullet/enemy broadphase scales with the number of things on screen.
+
+Fills a fresh GameState with N enemies and N bullets scattered over the
+playfield and times three ways of finding the bullet/enemy pairs that meet
+during one step, all on the same scene:
+
+* ``grid``: ``SpatialGrid.swept_pairs()``, exactly as ``step()`` calls it;
+* ``all pairs``: the same swept test on every bullet/enemy pair in NumPy,
+  with no broadphase, so the difference to ``grid`` is what the grid buys;
+* ``object loop``: the original Python loop of ``check_collision()`` over
+  every pair (end positions only, not swept).
+
+It also times ``step()`` on the scene, for scale.
+
+    python benchmarks/collision_scaling.py [--counts 10,20,50,100,200,500,800]
+
+Rough results on one core: the object loop wins up to a few dozen of each,
+which is an ordinary wave, because NumPy's fixed cost per call outweighs a
+short Python loop; the grid is ahead from around a hundred, and far ahead
+in the hundreds.  The grid stays because its cost barely grows with the
+scene, so bullet-heavy moments (upgraded ships, co-op) no longer spike the
+frame time, and because the swept test it runs is what stops fast bullets
+passing through small enemies.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from space_shooter.collision import check_collision, sweep_times
+from space_shooter.core import (
+    WIDTH, HEIGHT, GameState, Inputs, enemy_size, spawn_bullet, spawn_enemy, step,
+)
+
+
+def build_scene(count, seed):
+    state = GameState(seed, waves=[])
+    rng = random.Random(seed)
+    for _ in range(count):
+        x = rng.randint(0, WIDTH - enemy_size)
+        y = rng.randint(0, HEIGHT // 2)
+        spawn_enemy(state, x, y, rng.randrange(3))
+        spawn_bullet(state, rng.randint(0, WIDTH), rng.randint(HEIGHT // 4, HEIGHT))
+    # Keep the player out of the way and alive so every frame does full work
+    state.player_health = 10 ** 9
+    return state
+
+
+def scene_moves(state):
+    # Bullet and enemy boxes and their moves over one step, as step() has them
+    bullets, enemies = state.bullets, state.enemies
+    b, e = bullets.live(), enemies.live()
+    return bullets.boxes(b), -bullets.speed[b], enemies.boxes(e), enemies.speed[e]
+
+
+def grid_pairs(state):
+    bullet_boxes, bullet_move, enemy_boxes, enemy_move = scene_moves(state)
+    return state.grid.swept_pairs(bullet_boxes, (0.0, bullet_move), enemy_boxes, (0.0, enemy_move))
+
+
+def all_pairs(state):
+    bullet_boxes, bullet_move, enemy_boxes, enemy_move = scene_moves(state)
+    n_b, n_e = len(bullet_move), len(enemy_move)
+    ib = np.repeat(np.arange(n_b), n_e)
+    ie = np.tile(np.arange(n_e), n_b)
+    enter, leave = sweep_times([column[ib] for column in bullet_boxes], 0.0, bullet_move[ib] - enemy_move[ie],
+                               [column[ie] for column in enemy_boxes])
+    hit = (enter < leave) & (enter < 1) & (leave > 0)
+    return ib[hit], ie[hit]
+
+
+def object_loop(state):
+    # The loop the broadphase replaced: every bullet against every enemy
+    bullet_rects = list(zip(*(column.tolist() for column in state.bullets.boxes(state.bullets.live()))))
+    enemy_rects = list(zip(*(column.tolist() for column in state.enemies.boxes(state.enemies.live()))))
+    hits = 0
+    for bullet_rect in bullet_rects:
+        for enemy_rect in enemy_rects:
+            if check_collision(bullet_rect, enemy_rect):
+                hits += 1
+                break
+    return hits
+
+
+def time_ms(func, scenes):
+    start = time.perf_counter()
+    for scene in scenes:
+        func(scene)
+    return (time.perf_counter() - start) * 1000 / len(scenes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", default="10,20,50,100,200,500,800",
+                        help="comma separated entity counts (enemies and bullets each)")
+    parser.add_argument("--repeat", type=int, default=20, help="scenes timed per count")
+    args = parser.parse_args()
+
+    idle = Inputs()
+    # Warm up NumPy and the allocator before the first timed row
+    warm = build_scene(100, -1)
+    grid_pairs(warm)
+    all_pairs(warm)
+    step(warm, idle)
+    print(f"{'entities':>9} {'grid ms':>9} {'all pairs ms':>13} {'object loop ms':>15} {'step() ms':>10}")
+    for count in (int(c) for c in args.counts.split(",")):
+        scenes = [build_scene(count, seed) for seed in range(args.repeat)]
+        grid = time_ms(grid_pairs, scenes)
+        brute = time_ms(all_pairs, scenes)
+        loop = time_ms(object_loop, scenes)
+        frame = time_ms(lambda state: step(state, idle), scenes)
+        print(f"{count:>9} {grid:>9.3f} {brute:>13.3f} {loop:>15.3f} {frame:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
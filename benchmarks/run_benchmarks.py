@@ -0,0 +1,226 @@
+"""Headless benchmark suite with scripted stress scenarios.
+
+Each scenario runs the real game loop (simulation plus the pygame renderer on
+SDL's dummy video driver, or the simulation alone with --no-render) in its own
+process, so peak RSS is per scenario.  Results are printed as a table and can
+be saved as JSON and compared against a run from another commit:
+
+    python benchmarks/run_benchmarks.py --out before.json
+    python benchmarks/run_benchmarks.py --out after.json --compare before.json
+
+Reported per scenario: frames/sec, p50/p99 frame time, peak RSS, and
+allocations per frame.  Python has no cheap allocation counter, so the last
+one is the gen-0 GC counter: container objects allocated (net of those freed
+in between) per frame.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from space_shooter.core import (
+    HEIGHT, GameState, Inputs, Boss, spawn_enemy, step, upgrade_player,
+)
+
+
+def keep_alive(state):
+    state.player_health = state.player_max_health
+
+
+def swarm(state):
+    # 500 enemies on screen against a maxed-out ship sweeping side to side
+    for _ in range(4):
+        upgrade_player(state)
+    rng = random.Random(1)
+
+    def frame(i):
+        keep_alive(state)
+        # Kills would level the game up until new enemies cross the screen
+        # in a step; keep them at level 1 speed so there really are 500
+        state.level = 1
+        while len(state.enemies) < 500:
+            spawn_enemy(state, y=rng.randint(0, HEIGHT // 2))
+        return Inputs(left=i % 120 < 60, right=i % 120 >= 60, fire=True)
+    return frame
+
+
+def boss_spread(state):
+    # A boss that never dies firing its spread every few frames
+    def frame(i):
+        keep_alive(state)
+        if state.boss is None:
+            state.boss = Boss(state.boss_bullets)
+        state.boss.health = state.boss.max_health
+        state.boss.attack_delay = 5
+        return Inputs(fire=True)
+    return frame
+
+
+def explosion_storm(state):
+    # upgrade_player() every 10 frames, each one a 300 particle burst
+    def frame(i):
+        keep_alive(state)
+        if i % 10 == 0:
+            upgrade_player(state)
+        return Inputs(fire=True)
+    return frame
+
+
+def long_session(state):
+    # Ten minutes of ordinary play with a random but seeded policy
+    rng = random.Random(2)
+    move = [False, False]
+
+    def frame(i):
+        keep_alive(state)
+        if i % 20 == 0:
+            move[0], move[1] = rng.random() < 0.4, rng.random() < 0.4
+        return Inputs(left=move[0], right=move[1], fire=rng.random() < 0.8)
+    return frame
+
+
+# name -> (setup, frames at 60 FPS)
+SCENARIOS = {
+    "swarm": (swarm, 3000),
+    "boss_spread": (boss_spread, 3000),
+    "explosion_storm": (explosion_storm, 3000),
+    "long_session": (long_session, 36000),
+}
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name, frames, render):
+    """Run one scenario in this process and return its metrics."""
+    renderer = None
+    if render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        import pygame
+        from space_shooter.core import WIDTH
+        from space_shooter.render import Renderer
+        pygame.display.init()
+        pygame.font.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        renderer = Renderer(screen)
+
+    state = GameState(seed=0)
+    policy = SCENARIOS[name][0](state)
+    times = []
+    gc_before = gc.get_stats()[0]["collections"]
+    count_before = gc.get_count()[0]
+    start = time.perf_counter_ns()
+    for i in range(frames):
+        t0 = time.perf_counter_ns()
+        step(state, policy(i))
+        if renderer is not None:
+            renderer.draw(state)
+            renderer.present()
+        times.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter_ns() - start
+    collections = gc.get_stats()[0]["collections"] - gc_before
+    allocations = collections * gc.get_threshold()[0] + gc.get_count()[0] - count_before
+
+    times.sort()
+    return {
+        "frames": frames,
+        "fps": frames / (elapsed / 1e9),
+        "p50_ms": times[len(times) // 2] / 1e6,
+        "p99_ms": times[min(len(times) - 1, int(len(times) * 0.99))] / 1e6,
+        "peak_rss_mb": peak_rss_mb(),
+        "allocs_per_frame": allocations / frames,
+        "final_score": state.score,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    columns = ("fps", "p50_ms", "p99_ms", "peak_rss_mb", "allocs_per_frame")
+    print(f"{'scenario':<16}" + "".join(f"{c:>18}" for c in columns))
+    for name, metrics in results.items():
+        cells = []
+        for column in columns:
+            value = metrics[column]
+            cell = "n/a" if value is None else f"{value:.2f}"
+            old = (baseline or {}).get(name, {}).get(column)
+            if value is not None and old:
+                cell += f" ({(value - old) / old:+.0%})"
+            cells.append(f"{cell:>18}")
+        print(f"{name:<16}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark suite")
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"scenarios to run, from {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--no-render", action="store_true", help="benchmark the simulation only")
+    parser.add_argument("--quick", action="store_true", help="run a tenth of the frames")
+    parser.add_argument("--out", metavar="FILE", help="save the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="show changes against earlier JSON results")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Inside the per-scenario process: run it and report on stdout
+        name, frames = args.child.split(":")
+        print(json.dumps(run_scenario(name, int(frames), not args.no_render)))
+        return
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        frames = SCENARIOS[name][1] // (10 if args.quick else 1)
+        command = [sys.executable, os.path.abspath(__file__), "--child", f"{name}:{frames}"]
+        if args.no_render:
+            command.append("--no-render")
+        out = subprocess.run(command, capture_output=True, text=True, check=True)
+        results[name] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "commit": git_commit(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "render": not args.no_render,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
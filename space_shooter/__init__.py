@@ -0,0 +1,10 @@
+"""Space Shooter with Boss: headless simulation core plus an optional pygame renderer."""
+from .core import (
+    WIDTH,
+    HEIGHT,
+    GameState,
+    Inputs,
+    Tuning,
+    step,
+    run_headless,
+)
@@ -0,0 +1,134 @@
+"""Sounds, music and fonts, loaded without holding up the first frame.
+
+Opening the audio device and decoding the sound files happens on a
+background thread, so the window comes up straight away and sounds start
+playing once they are ready.  Each file is loaded on its own: a missing or
+broken file only silences that sound, and without an audio device the game
+simply runs silent.
+
+Looking a font up by name makes pygame scan every font on the system.  The
+resolved paths are kept in a small cache file so later starts skip the scan
+(delete it to pick up newly installed fonts).
+"""
+import json
+import os
+import threading
+from time import perf_counter
+
+import pygame
+
+FONT_CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "space_shooter", "fonts.json",
+)
+
+
+class Assets:
+    def __init__(self, root, sounds, music=None, font_cache=FONT_CACHE):
+        self.root = root
+        self.sound_files = sounds  # name -> file name under root
+        self.music_file = music
+        self.font_cache = font_cache
+
+        # Filled in by the loader thread
+        self.sounds = {}
+        self.missing = []
+        self.audio = False
+        self.music_loaded = False
+        self.load_time = None
+        self.loaded = threading.Event()
+
+        self.font_paths = self.read_font_cache()
+        self.fonts = {}
+
+    def start(self):
+        threading.Thread(target=self.load_audio, name="asset loader", daemon=True).start()
+
+    def load_audio(self):
+        start = perf_counter()
+        try:
+            pygame.mixer.init()
+            self.audio = True
+        except pygame.error as e:
+            print(f"No audio device ({e}), playing without sound.")
+
+        if self.audio:
+            for name, file in self.sound_files.items():
+                try:
+                    self.sounds[name] = pygame.mixer.Sound(os.path.join(self.root, file))
+                except (pygame.error, OSError):
+                    self.missing.append(file)
+
+            if self.music_file:
+                try:
+                    pygame.mixer.music.load(os.path.join(self.root, self.music_file))
+                    pygame.mixer.music.set_volume(0.5)
+                    pygame.mixer.music.play(-1)  # -1 means loop indefinitely
+                    self.music_loaded = True
+                except (pygame.error, OSError):
+                    self.missing.append(self.music_file)
+
+            if self.missing:
+                print(f"Could not load {', '.join(self.missing)}. Playing without them.")
+
+        self.load_time = perf_counter() - start
+        self.loaded.set()
+
+    def sound(self, name):
+        # None until loaded, or if it could not be
+        return self.sounds.get(name)
+
+    def play_music(self):
+        if self.music_loaded:
+            pygame.mixer.music.play(-1)
+
+    def pause_music(self):
+        if self.music_loaded:
+            pygame.mixer.music.pause()
+
+    def unpause_music(self):
+        if self.music_loaded:
+            pygame.mixer.music.unpause()
+
+    def stop_music(self):
+        if self.music_loaded:
+            pygame.mixer.music.stop()
+
+    def font(self, name, size, bold=False):
+        """Same as ``pygame.font.SysFont``, with the file lookup cached."""
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            path = self.font_path(name, bold)
+            font = self.fonts[key] = pygame.font.Font(path, size)
+            # No separate bold face: let pygame embolden the regular one
+            if bold and (path is None or path == self.font_path(name)):
+                font.set_bold(True)
+        return font
+
+    def font_path(self, name, bold=False):
+        key = f"{name}:{'bold' if bold else 'regular'}"
+        if key in self.font_paths:
+            path = self.font_paths[key]
+            if path is None or os.path.exists(path):
+                return path
+        path = pygame.font.match_font(name, bold)
+        self.font_paths[key] = path
+        self.write_font_cache()
+        return path
+
+    def read_font_cache(self):
+        try:
+            with open(self.font_cache) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def write_font_cache(self):
+        # Only a speed-up, so failing to write it is not an error
+        try:
+            os.makedirs(os.path.dirname(self.font_cache), exist_ok=True)
+            with open(self.font_cache, "w") as f:
+                json.dump(self.font_paths, f, indent=2)
+        except OSError:
+            pass
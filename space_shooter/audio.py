@@ -0,0 +1,68 @@
+"""Sound effects for the simulation's events, batched per frame.
+
+A busy frame can report the same event dozens of times (every enemy killed
+by a spread of bullets is an "explosion").  ``SoundMixer.play()`` takes the
+whole frame's events at once and starts each sound at most once, and only
+if that sound's cooldown has passed and one of its voices is free.
+
+Each sound gets its own reserved ``pygame.mixer.Channel``s, so a flood of
+one effect can never cut off another, and pygame never has to search for a
+free channel.
+"""
+from time import perf_counter
+
+import pygame
+
+# name -> (voices, minimum ms between starts)
+SOUND_LIMITS = {
+    "shoot": (2, 60),
+    "explosion": (3, 40),
+    "boss_hit": (2, 80),
+    "powerup": (1, 0),
+    "boss_spawn": (1, 0),
+    "game_over": (1, 0),
+}
+
+
+class SoundMixer:
+    def __init__(self, assets, limits=SOUND_LIMITS):
+        self.assets = assets
+        self.limits = limits
+        self.channels = None  # name -> its reserved channels, once the mixer is up
+        self.last_start = {name: float("-inf") for name in limits}
+        self.requested = 0
+        self.played = 0
+
+    def _reserve(self):
+        # The mixer comes up on the asset loader's thread, so wait for it
+        if not self.assets.loaded.is_set() or not self.assets.audio:
+            return False
+        if self.channels is None:
+            total = sum(voices for voices, _ in self.limits.values())
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total + 4))
+            pygame.mixer.set_reserved(total)
+            channels = iter(range(total))
+            self.channels = {
+                name: [pygame.mixer.Channel(next(channels)) for _ in range(voices)]
+                for name, (voices, _) in self.limits.items()
+            }
+        return True
+
+    def play(self, events):
+        """Play the sounds for one frame's events."""
+        self.requested += len(events)
+        if not events or not self._reserve():
+            return
+        now = perf_counter()
+        for name in dict.fromkeys(events):
+            sound = self.assets.sound(name)
+            if sound is None or name not in self.limits:
+                continue
+            if (now - self.last_start[name]) * 1000 < self.limits[name][1]:
+                continue
+            for channel in self.channels[name]:
+                if not channel.get_busy():
+                    channel.play(sound)
+                    self.last_start[name] = now
+                    self.played += 1
+                    break
@@ -0,0 +1,241 @@
+"""Balance sweeps: many headless games per difficulty setting, in parallel.
+
+Every combination of the values given with ``--vary`` is played ``--games``
+times by a bot, each game on its own seed in a ``ProcessPoolExecutor``
+worker, and the results are summed up per combination: how long the bot
+survived, its score and how often it beat a boss.  Every combination plays
+the same seeds, so differences between rows come from the settings and not
+from luck of the draw.
+
+    python -m space_shooter.balance --vary boss_health=300,500,800 \\
+        --vary level_speedup=0.05,0.1,0.2 --games 200 --out sweep.csv
+
+The settings that can be varied are the fields of ``core.Tuning`` plus two
+that change the wave file: ``enemy_spawn_scale`` multiplies the time between
+enemy spawns and ``boss_delay`` sets when the boss first comes and how long
+after its defeat it comes back.
+"""
+import argparse
+import csv
+import functools
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import SIM_HZ, WIDTH, GameState, Inputs, Tuning, player_size, step
+from .waves import DEFAULT_WAVES, load_waves
+
+WAVE_SETTINGS = ("enemy_spawn_scale", "boss_delay")
+SETTINGS = Tuning.__slots__ + WAVE_SETTINGS
+
+
+@functools.lru_cache(maxsize=None)
+def tweak_waves(path=DEFAULT_WAVES, enemy_spawn_scale=1.0, boss_delay=None):
+    # A copy of the wave file's events with the wave settings applied
+    events = []
+    for event in load_waves(path):
+        event = dict(event)
+        if event["spawn"] == "enemy" and "every" in event:
+            event["every"] *= enemy_spawn_scale
+        if event["spawn"] == "boss" and boss_delay is not None:
+            event["at"] = boss_delay
+            if "respawn" in event:
+                event["respawn"] = boss_delay
+        events.append(event)
+    return events
+
+
+def idle_policy(seed):
+    # Sit in the middle and keep firing
+    inputs = Inputs(fire=True)
+    return lambda state: inputs
+
+
+def random_policy(seed):
+    # Hold a random direction for a random while, firing most of the time
+    rng = random.Random(seed)
+    held = [Inputs(), 0]
+
+    def policy(state):
+        if held[1] <= 0:
+            move = rng.randrange(3)
+            held[0] = Inputs(move == 1, move == 2, rng.random() < 0.9)
+            held[1] = rng.randint(10, 40)
+        held[1] -= 1
+        return held[0]
+    return policy
+
+
+def hunter_policy(seed):
+    # Line up under the boss, or else the lowest enemy still well above, and
+    # fire; step aside from enemies and boss bullets about to land
+    def policy(state):
+        x = state.player_pos[0] + player_size / 2
+        y = state.player_pos[1]
+        enemies, pool = state.enemies, state.boss_bullets
+        live = enemies.live()
+        centers = enemies.x[live] + enemies.w[live] / 2
+        bottoms = enemies.y[live] + enemies.h[live]
+        # Where the boss bullets cross the ship's line, and how soon
+        n = pool.count
+        falling = pool.dy[:n] > 0
+        frames = (y - pool.y[:n][falling]) / pool.dy[:n][falling]
+        landing = pool.x[:n][falling] + pool.dx[:n][falling] * frames
+        threats = np.concatenate((
+            centers[(abs(centers - x) < player_size + enemies.w[live] / 2) & (bottoms > y - 150)],
+            landing[(abs(landing - x) < player_size) & (frames > -2) & (frames < 25)],
+        ))
+        if len(threats):
+            left = threats.mean() > x and x > player_size
+            return Inputs(left, not left and x < WIDTH - player_size, True)
+
+        target = WIDTH / 2
+        safe = bottoms < y - 150
+        if state.boss is not None:
+            target = state.boss.x + state.boss.size / 2
+        elif safe.any():
+            target = float(centers[safe][bottoms[safe].argmax()])
+        return Inputs(target < x - 4, target > x + 4, True)
+    return policy
+
+
+POLICIES = {"idle": idle_policy, "random": random_policy, "hunter": hunter_policy}
+
+
+def play(task):
+    """Play one game and return its result; runs in a worker process."""
+    settings, seed, policy, frames, waves = task
+    tuning = Tuning(**{name: value for name, value in settings.items() if name in Tuning.__slots__})
+    events = tweak_waves(waves, **{name: value for name, value in settings.items() if name in WAVE_SETTINGS})
+    state = GameState(seed, waves=events, tuning=tuning)
+    policy = POLICIES[policy](seed)
+    while state.frame < frames and not state.game_over:
+        step(state, policy(state))
+    return {
+        "survival": state.frame / state.sim_hz,
+        "died": state.game_over,
+        "score": state.score,
+        "level": state.level,
+        "bosses_killed": state.bosses_killed,
+    }
+
+
+def summarize(settings, results):
+    survival = [r["survival"] for r in results]
+    scores = [r["score"] for r in results]
+    kills = [r["bosses_killed"] for r in results]
+    return dict(settings, **{
+        "games": len(results),
+        "survival_mean": round(statistics.fmean(survival), 2),
+        "survival_median": round(statistics.median(survival), 2),
+        "survived_pct": round(100 * sum(not r["died"] for r in results) / len(results), 1),
+        "score_mean": round(statistics.fmean(scores), 1),
+        "score_median": statistics.median(scores),
+        "level_mean": round(statistics.fmean(r["level"] for r in results), 2),
+        "boss_kill_pct": round(100 * sum(k > 0 for k in kills) / len(results), 1),
+        "bosses_per_game": round(statistics.fmean(kills), 2),
+    })
+
+
+def sweep(grid, games=100, policy="hunter", minutes=5, waves=DEFAULT_WAVES, workers=None,
+          first_seed=0, progress=None):
+    """Play every combination of ``grid`` (setting -> list of values) ``games`` times.
+
+    Returns one summary dict per combination, in grid order.
+    """
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    frames = int(minutes * 60 * SIM_HZ)
+    tasks = [(settings, first_seed + i, policy, frames, waves) for settings in combos for i in range(games)]
+
+    workers = workers or os.cpu_count() or 1
+    # Big enough chunks to keep the pipes quiet, small enough to balance the
+    # load across workers when some settings make for much longer games
+    chunksize = max(1, min(16, len(tasks) // (workers * 8)))
+    results = []
+    with ProcessPoolExecutor(workers) as executor:
+        for result in executor.map(play, tasks, chunksize=chunksize):
+            results.append(result)
+            if progress is not None:
+                progress(len(results), len(tasks))
+    return [summarize(settings, results[i * games:(i + 1) * games]) for i, settings in enumerate(combos)]
+
+
+def parse_value(text):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"not a number: {text}")
+
+
+def print_report(rows):
+    columns = list(rows[0])
+    widths = [max(len(name), *(len(str(row[name])) for row in rows)) for name in columns]
+    print("  ".join(name.rjust(width) for name, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[name]).rjust(width) for name, width in zip(columns, widths)))
+
+
+def save_report(rows, path):
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless games per difficulty setting")
+    parser.add_argument("--vary", metavar="NAME=V1,V2,...", action="append", default=[],
+                        help=f"values to try for a setting, one of: {', '.join(SETTINGS)}")
+    parser.add_argument("--games", type=int, default=100, help="games per combination (default 100)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="hunter",
+                        help="bot that plays the games (default hunter)")
+    parser.add_argument("--minutes", type=float, default=5,
+                        help="stop a game that is still going after this long (default 5)")
+    parser.add_argument("--waves", metavar="FILE", default=DEFAULT_WAVES, help="wave file to play")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--out", metavar="FILE", help="also save the report as .csv or .json")
+    args = parser.parse_args()
+
+    grid = {}
+    for option in args.vary:
+        name, _, values = option.partition("=")
+        if name not in SETTINGS or not values:
+            parser.error(f"--vary {option}: expected NAME=V1,V2,... with NAME one of {', '.join(SETTINGS)}")
+        try:
+            grid[name] = [parse_value(value) for value in values.split(",")]
+        except argparse.ArgumentTypeError as e:
+            parser.error(f"--vary {option}: {e}")
+    if not grid:
+        grid = {"boss_health": [Tuning().boss_health]}  # Just the current settings
+
+    def progress(done, total):
+        if done == total or done % max(1, total // 20) == 0:
+            elapsed = time.perf_counter() - start
+            print(f"\r{done}/{total} games, {elapsed:.0f}s", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    rows = sweep(grid, args.games, args.policy, args.minutes, args.waves, args.workers, args.seed, progress)
+    print(file=sys.stderr)
+    print_report(rows)
+    if args.out:
+        save_report(rows, args.out)
+        print(f"Saved the report to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Collision helpers: AABB and circle narrowphase tests and a uniform-grid broadphase.
+
+Boxes are passed around as ``(x, y, w, h)``, either as plain numbers or as
+NumPy arrays holding one box per element.  The grid covers the playfield in
+square cells and only pairs of boxes sharing a cell reach the narrowphase.
+
+Fast, small things can pass right through each other between two steps, so
+the swept tests take where a box ended up and how far it moved this step and
+check the whole path, not just the end position.
+"""
+import numpy as np
+
+
+def check_collision(rect1, rect2):
+    # Same test as pygame.Rect.colliderect, on plain (x, y, w, h) tuples
+    x1, y1, w1, h1 = rect1
+    x2, y2, w2, h2 = rect2
+    return x1 < x2 + w2 and x2 < x1 + w1 and y1 < y2 + h2 and y2 < y1 + h1
+
+
+def overlaps(boxes, rect):
+    """Boolean mask of the boxes that overlap the single ``rect``."""
+    x, y, w, h = boxes
+    rx, ry, rw, rh = rect
+    return (x < rx + rw) & (rx < x + w) & (y < ry + rh) & (ry < y + h)
+
+
+def _slab(start, size, move, lo, length):
+    # When, as a fraction of the move, the span [start, start + size] moving
+    # by ``move`` starts and stops overlapping [lo, lo + length]
+    still = move == 0
+    move = np.where(still, 1.0, move)
+    t1 = (lo - start - size) / move
+    t2 = (lo + length - start) / move
+    inside = (start < lo + length) & (lo < start + size)
+    enter = np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+    leave = np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+    return enter, leave
+
+
+def sweep_times(boxes, dx, dy, rect):
+    """Entry and exit times (0 to 1) of ``boxes`` that moved by ``dx, dy`` into ``rect``.
+
+    ``boxes`` are where the move ended.  ``rect`` may itself hold arrays to
+    test pairs element by element.  No contact gives entry >= exit.
+    """
+    x, y, w, h = boxes
+    rx, ry, rw, rh = rect
+    enter_x, leave_x = _slab(x - dx, w, dx, rx, rw)
+    enter_y, leave_y = _slab(y - dy, h, dy, ry, rh)
+    return np.maximum(enter_x, enter_y), np.minimum(leave_x, leave_y)
+
+
+def swept_overlaps(boxes, dx, dy, rect):
+    """Boolean mask of the ``boxes`` that touched ``rect`` at any point of their move."""
+    x, y, w, h = boxes
+    dx, dy = np.broadcast_to(dx, np.shape(x)), np.broadcast_to(dy, np.shape(x))
+    # Only boxes whose covered area overlaps the rect get the exact test
+    hit = overlaps(swept_bounds(boxes, dx, dy), rect)
+    near = np.flatnonzero(hit)
+    if len(near):
+        enter, leave = sweep_times((x[near], y[near], w[near], h[near]), dx[near], dy[near], rect)
+        hit[near] = (enter < leave) & (enter < 1) & (leave > 0)
+    return hit
+
+
+def swept_circle_overlaps(x, y, dx, dy, radius, rect):
+    """Boolean mask of the circles that touched ``rect`` while moving by ``dx, dy``.
+
+    ``x``, ``y`` are the centres at the end of the move.
+    """
+    rx, ry, rw, rh = rect
+    r = radius
+    dx, dy = np.broadcast_to(dx, np.shape(x)), np.broadcast_to(dy, np.shape(x))
+    zeros = np.zeros(np.shape(x))
+    hit = overlaps(swept_bounds((x, y, zeros, zeros), dx, dy), (rx - r, ry - r, rw + 2 * r, rh + 2 * r))
+    near = np.flatnonzero(hit)
+    if not len(near):
+        return hit
+    x, y, dx, dy, zeros = x[near], y[near], dx[near], dy[near], zeros[near]
+
+    # The centre's path against the rect grown by the radius: two crossed
+    # boxes for the flat sides, and a circle at each corner
+    points = (x, y, zeros, zeros)
+    near_hit = swept_overlaps(points, dx, dy, (rx - r, ry, rw + 2 * r, rh))
+    near_hit |= swept_overlaps(points, dx, dy, (rx, ry - r, rw, rh + 2 * r))
+    x0, y0 = x - dx, y - dy
+    length2 = dx * dx + dy * dy
+    moved = length2 > 0
+    for cx, cy in ((rx, ry), (rx + rw, ry), (rx, ry + rh), (rx + rw, ry + rh)):
+        # Closest point of the path to the corner
+        t = np.divide((cx - x0) * dx + (cy - y0) * dy, length2, out=np.ones_like(length2), where=moved)
+        t = np.clip(t, 0.0, 1.0)
+        near_x = x0 + t * dx - cx
+        near_y = y0 + t * dy - cy
+        near_hit |= near_x * near_x + near_y * near_y < r * r
+    hit[near] = near_hit
+    return hit
+
+
+def swept_bounds(boxes, dx, dy):
+    # The area a box covered during its move
+    x, y, w, h = boxes
+    return np.minimum(x, x - dx), np.minimum(y, y - dy), w + np.abs(dx), h + np.abs(dy)
+
+
+class SpatialGrid:
+    def __init__(self, width, height, cell_size=64):
+        self.cell_size = cell_size
+        self.cols = width // cell_size + 1
+        self.rows = height // cell_size + 1
+
+    def _cells(self, boxes):
+        # One (cell, box) entry for every cell a box touches.  Boxes partly
+        # off the playfield are clamped onto the border cells.
+        x, y, w, h = boxes
+        size = self.cell_size
+        col0 = np.clip(x // size, 0, self.cols - 1).astype(np.int64)
+        col1 = np.clip((x + w) // size, 0, self.cols - 1).astype(np.int64)
+        row0 = np.clip(y // size, 0, self.rows - 1).astype(np.int64)
+        row1 = np.clip((y + h) // size, 0, self.rows - 1).astype(np.int64)
+        span = col1 - col0 + 1
+        counts = span * (row1 - row0 + 1)
+
+        ids = np.repeat(np.arange(len(x)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        span = span[ids]
+        cells = (row0[ids] + local // span) * self.cols + col0[ids] + local % span
+        return cells, ids
+
+    def _candidates(self, a, b):
+        # Every (ia, ib) sharing a cell, once per shared cell
+        a_cells, a_ids = self._cells(a)
+        b_cells, b_ids = self._cells(b)
+        order = np.argsort(b_cells, kind="stable")
+        b_cells, b_ids = b_cells[order], b_ids[order]
+
+        # Every b entry in the same cell as an a entry is a candidate
+        lo = np.searchsorted(b_cells, a_cells, "left")
+        counts = np.searchsorted(b_cells, a_cells, "right") - lo
+        ia = np.repeat(a_ids, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        ib = b_ids[np.repeat(lo, counts) + offsets]
+        return ia, ib
+
+    def swept_pairs(self, a, a_move, b, b_move):
+        """Return ``(ia, ib, t)`` for every pair of boxes that met this step.
+
+        ``a`` and ``b`` are where the boxes ended up and ``a_move``, ``b_move``
+        the ``(dx, dy)`` columns of how far each one moved.  ``t`` is when, as
+        a fraction of the step, the pair first touched.  Pairs come back
+        sorted by ``ia``, then by ``t``, each pair only once.
+        """
+        n_a, n_b = len(a[0]), len(b[0])
+        if not n_a or not n_b:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+
+        # Broadphase on the areas covered, then the exact test of a's move
+        # relative to b on the pairs whose areas overlap
+        a_dx, a_dy = (np.broadcast_to(np.asarray(m, dtype=float), (n_a,)) for m in a_move)
+        b_dx, b_dy = (np.broadcast_to(np.asarray(m, dtype=float), (n_b,)) for m in b_move)
+        a_area, b_area = swept_bounds(a, a_dx, a_dy), swept_bounds(b, b_dx, b_dy)
+        ia, ib = self._candidates(a_area, b_area)
+        ax, ay, aw, ah = a_area
+        bx, by, bw, bh = b_area
+        near = ((ax[ia] < bx[ib] + bw[ib]) & (bx[ib] < ax[ia] + aw[ia]) &
+                (ay[ia] < by[ib] + bh[ib]) & (by[ib] < ay[ia] + ah[ia]))
+        ia, ib = ia[near], ib[near]
+        if not len(ia):
+            return ia, ib, np.zeros(0)
+
+        ax, ay, aw, ah = a
+        bx, by, bw, bh = b
+        enter, leave = sweep_times((ax[ia], ay[ia], aw[ia], ah[ia]), a_dx[ia] - b_dx[ib],
+                                   a_dy[ia] - b_dy[ib], (bx[ib], by[ib], bw[ib], bh[ib]))
+        hit = (enter < leave) & (enter < 1) & (leave > 0)
+
+        keys, first = np.unique(ia[hit] * n_b + ib[hit], return_index=True)
+        ia, ib, t = keys // n_b, keys % n_b, np.maximum(enter[hit][first], 0.0)
+        order = np.lexsort((ib, t, ia))
+        return ia[order], ib[order], t[order]
@@ -0,0 +1,685 @@
+"""Headless simulation core for Space Shooter with Boss.
+
+Nothing in here touches pygame: the whole game lives in a ``GameState`` and is
+advanced one frame at a time by ``step(state, inputs)``.  Anything the
+renderer or the sound layer needs to react to (shots, explosions, game over)
+is reported through ``state.events``.
+
+Speeds and delays below are per frame at ``SIM_HZ``.  A state created with a
+different ``sim_hz`` scales them by its ``dt`` (the fraction of a 60 Hz frame
+one step covers), so the game plays at the same pace at any step rate.
+"""
+import random
+
+import numpy as np
+
+from .collision import SpatialGrid, check_collision, overlaps, swept_overlaps
+from .entities import EntityPool
+from .particles import BURST_SIZE, ParticleEmitter
+from .profiler import NULL_PROFILER
+from .projectiles import ProjectilePool, aimed, spiral, spread
+from .waves import WaveScheduler, load_waves
+
+# Screen dimensions
+WIDTH, HEIGHT = 800, 600
+
+# Simulation rate every speed and delay is tuned for
+SIM_HZ = 60
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+PURPLE = (128, 0, 128)
+ORANGE = (255, 165, 0)
+CYAN = (0, 255, 255)
+DARK_RED = (139, 0, 0)
+
+# Player settings
+player_size = 50
+player_speed = 8
+player_start_health = 100
+wingman_respawn = 300  # Frames a shot down wingman is out of the fight
+
+# Enemy settings
+enemy_size = 40
+formation_spacing = 60
+level_speedup = 0.1  # Enemies fall this much faster per level
+
+# Boss settings
+boss_max_health = 500
+boss_size = 120
+
+# Boss attacks per health phase (above 2/3, above 1/3, the rest): the boss
+# cycles through its phase's (pattern, frames until the next attack) steps.
+# A wave file can give a boss its own script with any number of phases.
+BOSS_SCRIPT = (
+    (("spread", 60),),
+    (("spread", 45), ("aimed", 30)),
+    (("spiral", 8),) * 6 + (("aimed", 20), ("spread", 40)),
+)
+
+# Bullet settings
+bullet_speed = 15
+bullet_cooldown_start = 10  # frames
+
+# Power-up settings
+powerup_size = 30
+health_pickup = 30
+rapid_fire_step = 2  # Frames off the bullet cooldown
+rapid_fire_min = 5
+power_pickup = 1
+upgrade_health = 50  # Added to max health
+
+# Type codes stored in the pools' ``kind`` column, and what they look like
+ENEMY_NORMAL, ENEMY_FAST, ENEMY_BIG = 0, 1, 2
+ENEMY_TYPES = ("normal", "fast", "big")
+ENEMY_COLORS = (RED, YELLOW, PURPLE)
+ENEMY_SIZES = (enemy_size, int(enemy_size * 0.7), int(enemy_size * 1.5))
+
+BULLET_NORMAL, BULLET_POWER = 0, 1
+BULLET_COLORS = (GREEN, YELLOW)
+BULLET_SIZES = ((5, 15), (8, 20))
+
+POWERUP_HEALTH, POWERUP_RAPID, POWERUP_POWER, POWERUP_UPGRADE = 0, 1, 2, 3
+POWERUP_TYPES = ("health", "rapid", "power", "upgrade")
+POWERUP_COLORS = (GREEN, BLUE, YELLOW, PURPLE)
+
+
+class Tuning:
+    """The difficulty settings a game is played with.
+
+    Defaults are the settings above; a different ``Tuning`` per ``GameState``
+    lets balance sweeps try other values side by side.  Spawn timing is not
+    in here, it comes from the wave file.
+    """
+    __slots__ = ("boss_health", "level_speedup", "health_pickup", "rapid_fire_step",
+                 "rapid_fire_min", "power_pickup", "upgrade_health")
+
+    def __init__(self, boss_health=boss_max_health, level_speedup=level_speedup,
+                 health_pickup=health_pickup, rapid_fire_step=rapid_fire_step,
+                 rapid_fire_min=rapid_fire_min, power_pickup=power_pickup,
+                 upgrade_health=upgrade_health):
+        self.boss_health = boss_health
+        self.level_speedup = level_speedup
+        self.health_pickup = health_pickup
+        self.rapid_fire_step = rapid_fire_step
+        self.rapid_fire_min = rapid_fire_min
+        self.power_pickup = power_pickup
+        self.upgrade_health = upgrade_health
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Inputs:
+    __slots__ = ("left", "right", "fire")
+
+    def __init__(self, left=False, right=False, fire=False):
+        self.left = left
+        self.right = right
+        self.fire = fire
+
+
+class Boss:
+    __slots__ = ("x", "y", "size", "health", "max_health", "script", "speed", "direction",
+                 "attack_timer", "attack_delay", "phase", "script_pos", "spiral_angle",
+                 "bullets", "prev_x")
+
+    def __init__(self, bullets, health=boss_max_health, script=BOSS_SCRIPT):
+        self.x = WIDTH // 2 - boss_size // 2
+        self.y = 50
+        self.size = boss_size
+        self.health = health
+        self.max_health = health
+        self.script = script
+        self.speed = 2
+        self.direction = 1  # 1 for right, -1 for left
+        self.attack_timer = 0
+        self.attack_delay = 60  # frames
+        self.phase = 0
+        self.script_pos = 0
+        self.spiral_angle = 0
+        self.bullets = bullets  # ProjectilePool shared with the game state
+        self.prev_x = self.x  # Where the last step started, for interpolation
+
+    def update(self, dt=1.0, target=None):
+        # Move side to side
+        self.prev_x = self.x
+        self.x += self.speed * self.direction * dt
+
+        # Change direction if hitting screen edge
+        if self.x <= 0 or self.x >= WIDTH - self.size:
+            self.direction *= -1
+
+        # Attack periodically
+        self.attack_timer += dt
+        if self.attack_timer >= self.attack_delay:
+            self.attack(target)
+            self.attack_timer = 0
+
+        return self.health <= 0
+
+    def attack(self, target=None):
+        # Next step of the script for the current health phase
+        phases = len(self.script)
+        phase = min(phases - 1, phases * (self.max_health - self.health) // self.max_health)
+        if phase != self.phase:
+            self.phase = phase
+            self.script_pos = 0
+        script = self.script[phase]
+        pattern, self.attack_delay = script[self.script_pos % len(script)]
+        self.script_pos += 1
+
+        x, y = self.x + self.size // 2, self.y + self.size
+        if pattern == "spread":
+            spread(self.bullets, x, y)
+        elif pattern == "spiral":
+            spiral(self.bullets, x, y, self.spiral_angle)
+            self.spiral_angle += 12
+        elif pattern == "aimed" and target is not None:
+            aimed(self.bullets, x, y, *target)
+
+    def get_rect(self):
+        return (self.x, self.y, self.size, self.size)
+
+
+class Wingman:
+    """A co-op ship flown by another player next to the main one.
+
+    Wingmen share the main ship's level, bullet power and fire rate, so
+    power-ups help the whole team, but have their own health.  One that is
+    shot down sits out ``wingman_respawn`` frames and comes back healed; the
+    game is over when the main ship goes down.
+    """
+    __slots__ = ("x", "prev_x", "health", "cooldown", "down")
+
+    def __init__(self, x, health=player_start_health):
+        self.x = x
+        self.prev_x = x  # For interpolation
+        self.health = health
+        self.cooldown = 0
+        self.down = 0  # Frames until back in the fight, 0 while flying
+
+    def rect(self, state):
+        return (self.x, state.player_pos[1], player_size, player_size)
+
+
+class GameState:
+    def __init__(self, seed=None, sim_hz=SIM_HZ, waves=None, tuning=None):
+        # Every random draw in the simulation goes through this generator so a
+        # run can be reproduced from its seed
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Steps per second, and how much of a 60 Hz frame one step covers
+        self.sim_hz = sim_hz
+        self.dt = SIM_HZ / sim_hz
+        # Spawn events from a wave file, see ``waves``
+        self.wave_events = load_waves() if waves is None else waves
+        self.tuning = tuning or Tuning()
+        # Broadphase for the frame's collision tests, rebuilt every step
+        self.grid = SpatialGrid(WIDTH, HEIGHT)
+        # Explosion particles are purely visual and draw from their own generator
+        self.particles = ParticleEmitter(seed=self.rng.getrandbits(64))
+        # Entity pools, allocated once and emptied on every reset
+        self.enemies = EntityPool()
+        self.bullets = EntityPool()
+        self.powerups = EntityPool()
+        self.boss_bullets = ProjectilePool(WIDTH, HEIGHT)
+        # Co-op ships, kept over resets like the players flying them
+        self.wingmen = []
+        self.reset()
+
+    def reset(self):
+        # Player
+        self.player_pos = [WIDTH // 2, HEIGHT - 2 * player_size]
+        self.player_prev_x = self.player_pos[0]  # For interpolation
+        self.player_max_health = player_start_health
+        self.player_health = self.player_max_health
+        self.player_level = 1
+        self.player_bullet_power = 1
+        for i, wingman in enumerate(self.wingmen):
+            self.wingmen[i] = Wingman(wingman_x(i), self.player_max_health)
+
+        # Entities
+        self.enemies.clear()
+        self.bullets.clear()
+        self.powerups.clear()
+        self.boss_bullets.clear()
+        self.particles.clear()
+        self.boss = None
+
+        # Spawning, and the wave event the current boss came from
+        self.waves = WaveScheduler(self.wave_events)
+        self.boss_wave = None
+
+        # Timers
+        self.bullet_cooldown = 0
+        self.bullet_cooldown_max = bullet_cooldown_start
+
+        # Game variables
+        self.score = 0
+        self.level = 1
+        self.bosses_killed = 0
+        self.game_over = False
+        self.frame = 0
+        self.events = []
+
+    def player_rect(self):
+        return (self.player_pos[0], self.player_pos[1], player_size, player_size)
+
+    def pool_stats(self):
+        # name -> (live, free) entries of every entity pool
+        return {
+            "enemies": self.enemies.stats(),
+            "bullets": self.bullets.stats(),
+            "powerups": self.powerups.stats(),
+            "boss bullets": self.boss_bullets.stats(),
+            "particles": self.particles.stats(),
+        }
+
+
+def wingman_x(i):
+    # Wingmen start on alternate sides of the main ship
+    offset = (i // 2 + 1) * 2 * player_size
+    return WIDTH // 2 + (offset if i % 2 == 0 else -offset)
+
+
+def add_wingman(state):
+    wingman = Wingman(wingman_x(len(state.wingmen)), state.player_max_health)
+    state.wingmen.append(wingman)
+    return wingman
+
+
+def spawn_enemy(state, x=None, y=0, kind=None):
+    rng = state.rng
+    if kind is None:
+        kind = ENEMY_NORMAL
+        rand = rng.random()
+        if rand < 0.1:  # 10% chance for big enemy
+            kind = ENEMY_BIG
+        elif rand < 0.3:  # 20% chance for fast enemy
+            kind = ENEMY_FAST
+    if x is None:
+        x = rng.randint(0, WIDTH - enemy_size)
+
+    speed = rng.uniform(2.0, 5.0) * (1 + state.level * state.tuning.level_speedup)
+    if kind == ENEMY_FAST:
+        speed *= 1.5
+    elif kind == ENEMY_BIG:
+        speed *= 0.7
+    size = ENEMY_SIZES[kind]
+    return state.enemies.spawn(x, y, speed, size, size, kind)
+
+
+def spawn_bullet(state, x, y, kind=BULLET_NORMAL):
+    speed = bullet_speed
+    w, h = BULLET_SIZES[kind]
+    power = state.player_bullet_power
+    if kind == BULLET_POWER:
+        speed *= 1.2
+        power *= 2
+    return state.bullets.spawn(x, y, speed, w, h, kind, power)
+
+
+def spawn_powerup(state, x=None, y=0):
+    if x is None:
+        x = state.rng.randint(0, WIDTH - powerup_size)
+    kind = state.rng.randrange(len(POWERUP_TYPES))
+    return state.powerups.spawn(x, y, 3, powerup_size, powerup_size, kind)
+
+
+def spawn_boss(state, health=boss_max_health, script=BOSS_SCRIPT):
+    state.boss = Boss(state.boss_bullets, health, script)
+    state.events.append("boss_spawn")
+
+
+def defeat_boss(state):
+    state.boss = None
+    state.bosses_killed += 1
+    # Bring the boss back later if its wave event says so
+    if state.boss_wave is not None:
+        event = state.wave_events[state.boss_wave]
+        if "respawn" in event:
+            state.waves.schedule(state.boss_wave, event["respawn"])
+        state.boss_wave = None
+
+
+def boss_script(event):
+    # The attack script a boss wave event asks for, or the default one
+    script = event.get("script")
+    if not script:
+        return BOSS_SCRIPT
+    return tuple(tuple((pattern, delay) for pattern, delay in phase) for phase in script)
+
+
+def spawn_wave(state, i):
+    """Spawn what wave event ``i`` asks for."""
+    event = state.wave_events[i]
+    count = event.get("count", 1)
+
+    if event["spawn"] == "boss":
+        # One boss at a time, events due while one is alive are skipped
+        if state.boss is None:
+            spawn_boss(state, event.get("health", state.tuning.boss_health), boss_script(event))
+            state.boss_wave = i
+        return
+
+    if event["spawn"] == "powerup":
+        for _ in range(count):
+            spawn_powerup(state)
+        return
+
+    kind = ENEMY_TYPES.index(event["kind"]) if "kind" in event else None
+    formation = event.get("formation")
+    if formation is None:
+        # A burst of ordinary spawns
+        ids = [spawn_enemy(state, kind=kind) for _ in range(count)]
+    else:
+        # Members share a kind and a speed so the shape holds as it falls;
+        # the rows above the first start off screen
+        if kind is None:
+            kind = ENEMY_NORMAL
+        spacing = event.get("spacing", formation_spacing)
+        offsets = np.arange(count) - (count - 1) / 2
+        if formation == "line":
+            xs, ys = offsets * spacing, np.zeros(count)
+        elif formation == "v":
+            xs, ys = offsets * spacing, -np.abs(offsets) * spacing
+        else:  # column
+            xs, ys = np.zeros(count), -np.arange(count) * spacing
+        half = int(xs.max())
+        center = event.get("x")
+        if center is None:
+            center = state.rng.randint(half, WIDTH - ENEMY_SIZES[kind] - half)
+        ids = [spawn_enemy(state, center + x, y, kind) for x, y in zip(xs.tolist(), ys.tolist())]
+        state.enemies.speed[ids] = state.enemies.speed[ids[0]]
+    if "speed" in event:
+        state.enemies.speed[ids] *= event["speed"]
+
+
+def upgrade_player(state):
+    state.player_level += 1
+    state.player_max_health += state.tuning.upgrade_health
+    state.player_health = state.player_max_health  # Fully heal when upgrading
+    state.player_bullet_power += 1
+
+    # Visual effect for upgrade
+    state.particles.burst(
+        state.player_pos[0] + player_size//2,
+        state.player_pos[1] + player_size//2,
+        20 * BURST_SIZE
+    )
+
+
+def explode_entity(state, pool, i):
+    size = int(pool.w[i])
+    x, y = float(pool.x[i]), float(pool.y[i])
+    state.particles.burst(x + size//2, y + size//2)
+    state.events.append("explosion")
+
+
+def damage_player(state, amount):
+    state.player_health -= amount
+    if state.player_health <= 0:
+        state.game_over = True
+        state.events.append("game_over")
+
+
+def damage_wingman(state, wingman, amount):
+    x, y = wingman.x + player_size//2, state.player_pos[1] + player_size//2
+    state.particles.burst(x, y)
+    state.events.append("explosion")
+    wingman.health -= amount
+    if wingman.health <= 0:
+        state.particles.burst(x, y, 3 * BURST_SIZE)
+        wingman.down = wingman_respawn
+
+
+def fire_bullets(state, x, y):
+    # Fire from the nose of the ship at ``x``
+    spawn_bullet(state, x + player_size//2 - 2, y)
+
+    # Higher level players can fire multiple bullets
+    if state.player_level >= 2:
+        spawn_bullet(state, x + player_size//4 - 2, y)
+        spawn_bullet(state, x + 3*player_size//4 - 2, y)
+    state.events.append("shoot")
+
+
+def update_wingmen(state, wingman_inputs):
+    # Same controls as the main ship, one ``Inputs`` per wingman; missing
+    # ones mean no keys held
+    dt = state.dt
+    for i, wingman in enumerate(state.wingmen):
+        wingman.prev_x = wingman.x
+        if wingman.down > 0:
+            wingman.down -= dt
+            if wingman.down <= 0:
+                wingman.down = 0
+                wingman.health = state.player_max_health
+            continue
+        inputs = wingman_inputs[i] if i < len(wingman_inputs) else None
+        if inputs is None:
+            continue
+        if inputs.left and wingman.x > 0:
+            wingman.x -= player_speed * dt
+        if inputs.right and wingman.x < WIDTH - player_size:
+            wingman.x += player_speed * dt
+        if wingman.cooldown > 0:
+            wingman.cooldown -= dt
+        if inputs.fire and wingman.cooldown <= 0:
+            fire_bullets(state, wingman.x, state.player_pos[1])
+            wingman.cooldown = state.bullet_cooldown_max
+
+
+def collect_powerup(state, kind, wingman=None):
+    # Health goes to whoever picked it up, everything else to the team
+    state.events.append("powerup")
+    tuning = state.tuning
+    if kind == POWERUP_HEALTH:
+        if wingman is None:
+            state.player_health = min(state.player_max_health, state.player_health + tuning.health_pickup)
+        else:
+            wingman.health = min(state.player_max_health, wingman.health + tuning.health_pickup)
+    elif kind == POWERUP_RAPID:
+        state.bullet_cooldown_max = max(tuning.rapid_fire_min,
+                                        state.bullet_cooldown_max - tuning.rapid_fire_step)
+    elif kind == POWERUP_POWER:
+        state.player_bullet_power += tuning.power_pickup
+    elif kind == POWERUP_UPGRADE:
+        upgrade_player(state)
+
+
+def step(state, inputs, profiler=NULL_PROFILER, wingman_inputs=()):
+    """Advance the simulation by one frame and return the frame's events.
+
+    ``profiler`` gets a ``lap()`` at the end of each phase of the update.
+    ``wingman_inputs`` has the ``Inputs`` of each of ``state.wingmen``.
+    """
+    state.events = []
+    if state.game_over:
+        return state.events
+    state.frame += 1
+    dt = state.dt
+    player_pos = state.player_pos
+    state.player_prev_x = player_pos[0]
+
+    # Handle player movement
+    if inputs.left and player_pos[0] > 0:
+        player_pos[0] -= player_speed * dt
+    if inputs.right and player_pos[0] < WIDTH - player_size:
+        player_pos[0] += player_speed * dt
+
+    # Handle shooting
+    if state.bullet_cooldown > 0:
+        state.bullet_cooldown -= dt
+
+    if inputs.fire and state.bullet_cooldown <= 0:
+        fire_bullets(state, player_pos[0], player_pos[1])
+        state.bullet_cooldown = state.bullet_cooldown_max
+
+    update_wingmen(state, wingman_inputs)
+    flying = [wingman for wingman in state.wingmen if not wingman.down]
+
+    profiler.lap("input")
+
+    # Spawn enemies, power-ups and bosses from the wave schedule
+    for i in state.waves.advance(dt):
+        spawn_wave(state, i)
+
+    profiler.lap("spawning")
+
+    player_rect = state.player_rect()
+    enemies, bullets, powerups = state.enemies, state.bullets, state.powerups
+
+    # Update enemies
+    live = enemies.live()
+    enemies.y[live] += enemies.speed[live] * dt
+    gone = live[enemies.y[live] > HEIGHT]
+    enemies.kill(gone)
+    state.score += len(gone)
+
+    # Enemies that ran into the player
+    live = enemies.live()
+    crashed = live[overlaps(enemies.boxes(live), player_rect)]
+    for i in crashed.tolist():
+        explode_entity(state, enemies, i)
+        damage_player(state, 10)
+    enemies.kill(crashed)
+    for wingman in flying:
+        live = enemies.live()
+        crashed = live[overlaps(enemies.boxes(live), wingman.rect(state))]
+        for i in crashed.tolist():
+            explode_entity(state, enemies, i)
+            damage_wingman(state, wingman, 10)
+        enemies.kill(crashed)
+
+    profiler.lap("enemies")
+
+    # Update bullets. Ones that flew off the top are removed after the
+    # collision checks, they may have hit something on the way out.
+    live = bullets.live()
+    bullets.y[live] -= bullets.speed[live] * dt
+    gone = live[bullets.y[live] < 0]
+
+    # Check for collisions with enemies along the whole of this step's
+    # movement, so fast bullets cannot skip over small enemies; only pairs in
+    # nearby cells are tested.  Pairs come sorted by bullet and then by time
+    # of contact, so each bullet destroys the first enemy in its path that an
+    # earlier bullet has not already destroyed.
+    targets = enemies.live()
+    bullet_move = -bullets.speed[live] * dt
+    hit_bullets, hit_enemies, _ = state.grid.swept_pairs(
+        bullets.boxes(live), (0.0, bullet_move),
+        enemies.boxes(targets), (0.0, enemies.speed[targets] * dt))
+    spent = set()
+    destroyed = set()
+    for b, e in zip(live[hit_bullets].tolist(), targets[hit_enemies].tolist()):
+        if b in spent or e in destroyed:
+            continue
+        spent.add(b)
+        destroyed.add(e)
+        state.score += 5
+        explode_entity(state, enemies, e)
+    enemies.kill(np.array(sorted(destroyed), dtype=np.int64))
+
+    # Check for collisions with boss
+    boss = state.boss
+    if boss:
+        for b in live[swept_overlaps(bullets.boxes(live), 0.0, bullet_move, boss.get_rect())].tolist():
+            if b in spent:
+                continue  # Already stopped by an enemy
+            spent.add(b)
+            boss.health -= int(bullets.power[b])
+            state.events.append("boss_hit")
+            if boss.health <= 0:
+                state.score += 100
+                state.particles.burst(boss.x + boss.size//2, boss.y + boss.size//2)
+                state.events.append("explosion")
+                defeat_boss(state)
+                # Spawn power-ups when boss is defeated
+                for _ in range(3):
+                    spawn_powerup(state)
+                break
+    bullets.kill(np.array(sorted(spent | set(gone.tolist())), dtype=np.int64))
+
+    profiler.lap("bullets")
+
+    # Update boss
+    boss = state.boss
+    player_center = (player_pos[0] + player_size//2, player_pos[1] + player_size//2)
+    if boss:
+        if boss.update(dt, player_center):  # Returns True if boss is defeated
+            defeat_boss(state)
+
+        # Check for collision with player
+        if check_collision(boss.get_rect(), player_rect):
+            state.particles.burst(*player_center)
+            state.events.append("explosion")
+            damage_player(state, 30)
+        for wingman in flying:
+            if check_collision(boss.get_rect(), wingman.rect(state)):
+                damage_wingman(state, wingman, 30)
+
+    # Boss bullets keep flying after the boss is gone, and are used up when
+    # they hit the player
+    state.boss_bullets.update(dt)
+    player_move = player_pos[0] - state.player_prev_x
+    for _ in range(state.boss_bullets.hits(player_rect, dt, player_move)):
+        state.particles.burst(*player_center)
+        state.events.append("explosion")
+        damage_player(state, 15)
+    for wingman in flying:
+        for _ in range(state.boss_bullets.hits(wingman.rect(state), dt, wingman.x - wingman.prev_x)):
+            damage_wingman(state, wingman, 15)
+
+    profiler.lap("boss")
+
+    # Update power-ups
+    live = powerups.live()
+    powerups.y[live] += powerups.speed[live] * dt
+    powerups.kill(live[powerups.y[live] > HEIGHT])
+
+    # Power-ups the player picked up
+    live = powerups.live()
+    collected = live[overlaps(powerups.boxes(live), player_rect)]
+    powerups.kill(collected)
+    for kind in powerups.kind[collected].tolist():
+        collect_powerup(state, kind)
+    for wingman in flying:
+        live = powerups.live()
+        collected = live[overlaps(powerups.boxes(live), wingman.rect(state))]
+        powerups.kill(collected)
+        for kind in powerups.kind[collected].tolist():
+            collect_powerup(state, kind, wingman)
+
+    profiler.lap("powerups")
+
+    # Update explosions
+    state.particles.update(dt)
+    profiler.lap("explosions")
+
+    # Level up based on score
+    state.level = state.score // 50 + 1
+    return state.events
+
+
+def run_headless(frames, seed=None, policy=None, waves=None, tuning=None):
+    """Run ``frames`` frames without any display and return the final state.
+
+    ``policy`` is called as ``policy(state)`` each frame and must return an
+    ``Inputs``; by default the ship sits still and keeps firing.  ``waves``
+    replaces the built-in wave events (see ``waves.load_waves()``) and
+    ``tuning`` the default ``Tuning``.
+    """
+    state = GameState(seed, waves=waves, tuning=tuning)
+    idle = Inputs(fire=True)
+    for _ in range(frames):
+        if state.game_over:
+            break
+        step(state, policy(state) if policy else idle)
+    return state
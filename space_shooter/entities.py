@@ -0,0 +1,99 @@
+"""Array-backed entity storage.
+
+Enemies, player bullets and power-ups each live in an ``EntityPool``: one
+NumPy column per attribute, indexed by slot.  Movement, culling and overlap
+tests run on whole columns at once, and the slots of dead entities go on a
+free list to be reused by the next spawn.
+
+Particles and boss bullets are never looked up by slot, so their pools keep
+the live entries packed at the front instead and fill the holes left by dead
+ones with ``swap_remove()``.
+
+Every pool reports ``stats()``: how many entries are live and how many are
+allocated but free for reuse.
+"""
+import numpy as np
+
+
+def swap_remove(columns, count, dead):
+    """Drop rows ``dead`` (sorted, unique) from the first ``count`` rows.
+
+    Rows from the end move into the holes, so the cost is proportional to
+    the number removed rather than the number kept.  Returns the new count.
+    """
+    kept = count - len(dead)
+    holes = dead[dead < kept]
+    if len(holes):
+        # Survivors past the new end fill the holes below it
+        tail = np.ones(count - kept, dtype=bool)
+        tail[dead[dead >= kept] - kept] = False
+        movers = np.flatnonzero(tail) + kept
+        for column in columns:
+            column[holes] = column[movers]
+    return kept
+
+
+class EntityPool:
+    __slots__ = ("capacity", "x", "y", "speed", "w", "h", "kind", "power", "alive", "free")
+
+    def __init__(self, capacity=64):
+        self.capacity = 0
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.speed = np.zeros(0)
+        self.w = np.zeros(0)
+        self.h = np.zeros(0)
+        self.kind = np.zeros(0, dtype=np.int8)     # Type code, meaning depends on the pool
+        self.power = np.zeros(0, dtype=np.int32)   # Damage, only used by bullets
+        self.alive = np.zeros(0, dtype=bool)
+        self.free = []  # Dead slots, the next spawn pops from the end
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        old = self.capacity
+        for name in ("x", "y", "speed", "w", "h", "kind", "power", "alive"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self.capacity = capacity
+        # Push new slots highest first so they are handed out lowest first
+        self.free.extend(range(capacity - 1, old - 1, -1))
+
+    def spawn(self, x, y, speed, w, h, kind=0, power=0):
+        if not self.free:
+            self._grow(self.capacity * 2)
+        i = self.free.pop()
+        self.x[i] = x
+        self.y[i] = y
+        self.speed[i] = speed
+        self.w[i] = w
+        self.h[i] = h
+        self.kind[i] = kind
+        self.power[i] = power
+        self.alive[i] = True
+        return i
+
+    def kill(self, indices):
+        # Accepts a single slot or an array of slots, all of which must be alive
+        indices = np.atleast_1d(indices)
+        if len(indices):
+            self.alive[indices] = False
+            self.free.extend(indices.tolist())
+
+    def clear(self):
+        self.alive[:] = False
+        self.free = list(range(self.capacity - 1, -1, -1))
+
+    def live(self):
+        return np.flatnonzero(self.alive)
+
+    def boxes(self, indices):
+        return self.x[indices], self.y[indices], self.w[indices], self.h[indices]
+
+    def stats(self):
+        # (live, free) slots
+        return self.capacity - len(self.free), len(self.free)
+
+    def __len__(self):
+        return self.capacity - len(self.free)
@@ -0,0 +1,241 @@
+"""Reinforcement-learning environments on top of the headless core.
+
+``ShooterEnv`` follows the Gym API: ``reset()`` returns ``(observation,
+info)`` and ``step(action)`` returns ``(observation, reward, terminated,
+truncated, info)``.  Actions are indices into ``ACTIONS``.  Gym itself is
+not needed.
+
+Observations are read straight from the entity pools, with no drawing:
+
+* ``"state"``: a flat float32 vector (see ``OBSERVATION_SIZE``) with the
+  player, the ``max_enemies`` lowest enemies, the boss, the ``max_bullets``
+  boss bullets nearest the ship and the ``max_powerups`` lowest power-ups.
+  Positions are scaled to 0..1 of the screen; absent entries are all zero,
+  their "present" field included.
+* ``"pixels"``: a small uint8 image, one channel each for the player,
+  enemies, the boss and its bullets, and power-ups, rasterised with NumPy
+  at ``pixel_scale`` of the screen size.
+
+The reward is the score gained in the step minus ``damage_penalty`` per
+point of health lost.
+
+``VectorEnv`` runs ``n`` games in lockstep in one process and hands back
+observations, rewards and flags as NumPy arrays with one row per game.
+Finished games are reset by themselves.
+"""
+import numpy as np
+
+from .core import HEIGHT, WIDTH, GameState, Inputs, player_size, step
+
+# Discrete actions: (left, right, fire)
+ACTIONS = (
+    Inputs(),
+    Inputs(left=True),
+    Inputs(right=True),
+    Inputs(fire=True),
+    Inputs(left=True, fire=True),
+    Inputs(right=True, fire=True),
+)
+
+# Fields per entry of the state vector
+PLAYER_FIELDS = 5   # x, y, health, bullet power, ship level
+ENEMY_FIELDS = 6    # present, x, y, w, h, speed
+BOSS_FIELDS = 5     # present, x, y, health, dx
+BULLET_FIELDS = 5   # present, x, y, dx, dy
+POWERUP_FIELDS = 4  # present, x, y, kind
+
+PIXEL_CHANNELS = 4  # player, enemies, boss and its bullets, power-ups
+
+
+def observation_size(max_enemies=16, max_bullets=32, max_powerups=4):
+    return (PLAYER_FIELDS + max_enemies * ENEMY_FIELDS + BOSS_FIELDS +
+            max_bullets * BULLET_FIELDS + max_powerups * POWERUP_FIELDS)
+
+
+OBSERVATION_SIZE = observation_size()
+
+
+def observe(state, out, max_enemies=16, max_bullets=32, max_powerups=4):
+    """Write ``state``'s observation vector into the float32 array ``out``."""
+    out[:] = 0
+    px, py = state.player_pos
+    out[:PLAYER_FIELDS] = (px / WIDTH, py / HEIGHT, max(0, state.player_health) / state.player_max_health,
+                           state.player_bullet_power / 10, state.player_level / 10)
+    at = PLAYER_FIELDS
+
+    # Enemies closest to the bottom first
+    enemies = state.enemies
+    live = enemies.live()
+    live = live[np.argsort(-enemies.y[live], kind="stable")[:max_enemies]]
+    rows = out[at:at + max_enemies * ENEMY_FIELDS].reshape(max_enemies, ENEMY_FIELDS)[:len(live)]
+    rows[:, 0] = 1
+    rows[:, 1] = enemies.x[live] / WIDTH
+    rows[:, 2] = enemies.y[live] / HEIGHT
+    rows[:, 3] = enemies.w[live] / WIDTH
+    rows[:, 4] = enemies.h[live] / HEIGHT
+    rows[:, 5] = enemies.speed[live] / HEIGHT
+    at += max_enemies * ENEMY_FIELDS
+
+    boss = state.boss
+    if boss is not None:
+        out[at:at + BOSS_FIELDS] = (1, boss.x / WIDTH, boss.y / HEIGHT, boss.health / boss.max_health,
+                                    boss.speed * boss.direction / WIDTH)
+    at += BOSS_FIELDS
+
+    # Boss bullets nearest the ship's centre first
+    pool = state.boss_bullets
+    n = pool.count
+    x, y = pool.x[:n], pool.y[:n]
+    cx, cy = px + player_size / 2, py + player_size / 2
+    nearest = np.argsort((x - cx) ** 2 + (y - cy) ** 2, kind="stable")[:max_bullets]
+    rows = out[at:at + max_bullets * BULLET_FIELDS].reshape(max_bullets, BULLET_FIELDS)[:len(nearest)]
+    rows[:, 0] = 1
+    rows[:, 1] = x[nearest] / WIDTH
+    rows[:, 2] = y[nearest] / HEIGHT
+    rows[:, 3] = pool.dx[:n][nearest] / WIDTH
+    rows[:, 4] = pool.dy[:n][nearest] / HEIGHT
+    at += max_bullets * BULLET_FIELDS
+
+    powerups = state.powerups
+    live = powerups.live()
+    live = live[np.argsort(-powerups.y[live], kind="stable")[:max_powerups]]
+    rows = out[at:at + max_powerups * POWERUP_FIELDS].reshape(max_powerups, POWERUP_FIELDS)[:len(live)]
+    rows[:, 0] = 1
+    rows[:, 1] = powerups.x[live] / WIDTH
+    rows[:, 2] = powerups.y[live] / HEIGHT
+    rows[:, 3] = (powerups.kind[live] + 1) / 4
+    return out
+
+
+def _fill_boxes(image, x, y, w, h, scale):
+    # Set every pixel of ``image`` (rows, cols) that a box covers any part of
+    if not len(x):
+        return
+    rows, cols = image.shape
+    x0 = np.clip((x * scale).astype(np.int64), 0, cols)
+    x1 = np.clip(np.ceil((x + w) * scale).astype(np.int64), 0, cols)
+    y0 = np.clip((y * scale).astype(np.int64), 0, rows)
+    y1 = np.clip(np.ceil((y + h) * scale).astype(np.int64), 0, rows)
+    c = np.arange(cols)
+    r = np.arange(rows)
+    in_cols = (c >= x0[:, None]) & (c < x1[:, None])
+    in_rows = (r >= y0[:, None]) & (r < y1[:, None])
+    # Boxes are few and the image small, so the (box, row, col) product is cheap
+    image |= ((in_rows[:, :, None] & in_cols[:, None, :]).any(axis=0) * np.uint8(255))
+
+
+def render_pixels(state, out, scale=0.1):
+    """Rasterise ``state`` into ``out``, a (channels, rows, cols) uint8 array."""
+    out[:] = 0
+    px, py = state.player_pos
+    _fill_boxes(out[0], np.array([px], float), np.array([py], float),
+                np.array([player_size], float), np.array([player_size], float), scale)
+    enemies = state.enemies
+    _fill_boxes(out[1], *enemies.boxes(enemies.live()), scale)
+    if state.boss is not None:
+        _fill_boxes(out[2], *(np.array([v], float) for v in state.boss.get_rect()), scale)
+    pool = state.boss_bullets
+    n, r = pool.count, pool.radius
+    size = np.full(n, 2.0 * r)
+    _fill_boxes(out[2], pool.x[:n] - r, pool.y[:n] - r, size, size, scale)
+    powerups = state.powerups
+    _fill_boxes(out[3], *powerups.boxes(powerups.live()), scale)
+    return out
+
+
+class ShooterEnv:
+    def __init__(self, seed=None, observation="state", frame_skip=1, max_steps=18000,
+                 damage_penalty=0.1, pixel_scale=0.1, max_enemies=16, max_bullets=32,
+                 max_powerups=4, waves=None, tuning=None):
+        if observation not in ("state", "pixels"):
+            raise ValueError("observation must be 'state' or 'pixels'")
+        self.observation = observation
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.damage_penalty = damage_penalty
+        self.pixel_scale = pixel_scale
+        self.limits = (max_enemies, max_bullets, max_powerups)
+        self.action_count = len(ACTIONS)
+        if observation == "state":
+            self.observation_shape = (observation_size(*self.limits),)
+        else:
+            self.observation_shape = (PIXEL_CHANNELS, int(HEIGHT * pixel_scale), int(WIDTH * pixel_scale))
+        self.waves = waves
+        self.tuning = tuning
+        self.state = GameState(seed, waves=waves, tuning=tuning)
+        self.steps = 0
+
+    def observe(self, out=None):
+        if self.observation == "state":
+            if out is None:
+                out = np.zeros(self.observation_shape, dtype=np.float32)
+            return observe(self.state, out, *self.limits)
+        if out is None:
+            out = np.zeros(self.observation_shape, dtype=np.uint8)
+        return render_pixels(self.state, out, self.pixel_scale)
+
+    def info(self):
+        state = self.state
+        return {"score": state.score, "level": state.level, "health": state.player_health,
+                "bosses_killed": state.bosses_killed, "frame": state.frame}
+
+    def reset(self, seed=None, out=None):
+        # A new seed starts over as GameState(seed) would; without one the
+        # next game carries on from the same random generator
+        if seed is not None:
+            self.state = GameState(seed, waves=self.waves, tuning=self.tuning)
+        else:
+            self.state.reset()
+        self.steps = 0
+        return self.observe(out), self.info()
+
+    def step(self, action, out=None):
+        state = self.state
+        score, health = state.score, state.player_health
+        inputs = ACTIONS[action]
+        for _ in range(self.frame_skip):
+            step(state, inputs)
+            if state.game_over:
+                break
+        self.steps += 1
+        reward = state.score - score - self.damage_penalty * max(0, health - state.player_health)
+        truncated = self.steps >= self.max_steps and not state.game_over
+        return self.observe(out), reward, state.game_over, truncated, self.info()
+
+
+class VectorEnv:
+    """``n`` independent games stepped together, with batched arrays in and out.
+
+    ``step(actions)`` takes one action per game.  A game that ends is reset
+    straight away; its final score is in ``info["final_score"]`` (-1 for
+    games that did not end) and the observation returned is the new game's.
+    """
+
+    def __init__(self, n, seed=0, **options):
+        self.envs = [ShooterEnv(seed + i, **options) for i in range(n)]
+        self.n = n
+        first = self.envs[0]
+        self.action_count = first.action_count
+        dtype = np.float32 if first.observation == "state" else np.uint8
+        self.observations = np.zeros((n,) + first.observation_shape, dtype=dtype)
+        self.rewards = np.zeros(n, dtype=np.float32)
+        self.terminated = np.zeros(n, dtype=bool)
+        self.truncated = np.zeros(n, dtype=bool)
+        self.final_score = np.zeros(n, dtype=np.int64)
+
+    def reset(self, seed=None):
+        for i, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + i, self.observations[i])
+        return self.observations, {}
+
+    def step(self, actions):
+        # The arrays returned are reused by the next call: copy to keep them
+        self.final_score[:] = -1
+        for i, (env, action) in enumerate(zip(self.envs, np.asarray(actions).tolist())):
+            row = self.observations[i]
+            _, self.rewards[i], self.terminated[i], self.truncated[i], _ = env.step(action, row)
+            if self.terminated[i] or self.truncated[i]:
+                self.final_score[i] = env.state.score
+                env.reset(out=row)
+        return (self.observations, self.rewards, self.terminated, self.truncated,
+                {"final_score": self.final_score})
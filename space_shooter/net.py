@@ -0,0 +1,679 @@
+"""Co-op over UDP: one authoritative server, any number of mirroring clients.
+
+The server runs the only real ``GameState``.  The first player to join
+flies the main ship and the others ``Wingman`` ships next to it, so up to
+``MAX_PLAYERS`` cabinets share one boss fight.  Clients only send inputs
+and draw what the server tells them.
+
+Client -> server, every simulation step: an ``INPUT`` packet with the
+newest input sequence number and the last few inputs (so one lost packet
+loses nothing), the newest snapshot tick received (the ack) and timing
+for round-trip measurement.  The server plays each client's inputs in
+sequence order, one per step, and ignores anything older than what it has.
+
+Server -> client, every ``send_every`` steps: a ``SNAPSHOT`` with the
+scores and ships as plain fields, and the enemies, bullets, power-ups and
+boss bullets as one int16 vector: positions quantised to 1/8 pixel, one
+column per field over every pool slot.  The vector is sent as its
+difference from the last snapshot that client acked (or whole, as a
+keyframe, when there is none), zlib-compressed; moving things change by
+small steady amounts and the rest not at all, so most of it compresses
+away.
+
+Clients draw ``interp_delay`` steps behind the newest snapshot,
+interpolating between the two around that moment; boss bullets, which
+have no stable slot, are placed along their velocity instead.
+
+``LossySocket`` can drop, delay and reorder outgoing packets, and
+``python -m space_shooter.net loopback`` runs a server and bot clients on
+127.0.0.1 through it and reports bandwidth, round-trip time, loss and
+whether every client rebuilt the server's state exactly.
+"""
+import argparse
+import heapq
+import random
+import socket
+import struct
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+
+from .core import (
+    BULLET_SIZES, ENEMY_SIZES, SIM_HZ, Boss, GameState, Inputs, Wingman, add_wingman, player_size,
+    powerup_size, step,
+)
+from .particles import BURST_SIZE
+from .replay import RESTART, decode_inputs, encode_inputs
+from .waves import DEFAULT_WAVES, load_waves
+
+MAGIC = b"SSNT"
+PROTOCOL = 1
+HELLO, WELCOME, INPUT, SNAPSHOT, BYE = range(1, 6)
+MAX_PLAYERS = 4
+DEFAULT_PORT = 5405
+
+# type, magic, protocol version
+HELLO_PACKET = struct.Struct("<B4sB")
+# type, player (0 = main ship), step rate, current tick
+WELCOME_PACKET = struct.Struct("<BBHI")
+# type, newest input sequence, acked tick, client clock ms, measured rtt ms,
+# input count; followed by that many input bytes, oldest first
+INPUT_PACKET = struct.Struct("<BIIIHB")
+# type, tick, base tick (0 for a keyframe), echoed client clock ms, ms the
+# server held it, pool capacities (enemies, bullets, power-ups, boss bullets)
+SNAPSHOT_PACKET = struct.Struct("<BIIIH4H")
+# score, level, ship level, bullet power, health, max health, game over,
+# boss present, boss health, boss max health, player x, boss x, boss y,
+# newest input sequence received from this client, event bits, wingman count
+STATUS = struct.Struct("<iHHHhh??iihhhIHB")
+# x, health, shot down
+WINGMAN_STATUS = struct.Struct("<hh?")
+BYE_PACKET = struct.Struct("<B")
+
+INPUT_REDUNDANCY = 8  # Inputs repeated in every packet
+HISTORY = 120         # Ticks of vectors kept on both ends to delta against
+SCALE = 8             # Positions travel in 1/8 pixel steps
+VELOCITY_SCALE = 256
+TIMEOUT = 5.0         # Seconds of silence before a client is dropped
+
+EVENT_BITS = {"shoot": 1, "explosion": 2, "boss_hit": 4, "powerup": 8, "boss_spawn": 16, "game_over": 32}
+
+
+def _quantise(values, scale=SCALE):
+    return np.clip(np.round(values * scale), -32768, 32767).astype(np.int16)
+
+
+def encode_entities(state):
+    """Return ``(layout, vector)``: the pool capacities and the int16 entity vector."""
+    columns = []
+    for pool in (state.enemies, state.bullets, state.powerups):
+        alive = pool.alive
+        columns += [alive.astype(np.int16), np.where(alive, _quantise(pool.x), 0),
+                    np.where(alive, _quantise(pool.y), 0), np.where(alive, pool.kind, 0).astype(np.int16)]
+    pool = state.boss_bullets
+    n = pool.count
+    for values, scale in ((None, 1), (pool.x, SCALE), (pool.y, SCALE), (pool.dx, VELOCITY_SCALE),
+                          (pool.dy, VELOCITY_SCALE)):
+        column = np.zeros(pool.capacity, dtype=np.int16)
+        column[:n] = 1 if values is None else _quantise(values[:n], scale)
+        columns.append(column)
+    layout = (state.enemies.capacity, state.bullets.capacity, state.powerups.capacity, pool.capacity)
+    return layout, np.concatenate(columns)
+
+
+def split_entities(layout, vector):
+    # The vector's columns back as {group: (alive, x, y, extra...)}
+    groups = {}
+    at = 0
+    for name, capacity, fields in zip(("enemies", "bullets", "powerups", "boss bullets"), layout, (4, 4, 4, 5)):
+        groups[name] = [vector[at + i * capacity:at + (i + 1) * capacity] for i in range(fields)]
+        at += fields * capacity
+    return groups
+
+
+def encode_delta(vector, base):
+    # int16 arithmetic wraps, and decoding wraps it back
+    return zlib.compress((vector if base is None else vector - base).tobytes(), 6)
+
+
+def decode_delta(data, base):
+    vector = np.frombuffer(zlib.decompress(data), dtype=np.int16)
+    return vector.copy() if base is None else vector + base
+
+
+def _clock_ms(start):
+    return int((time.perf_counter() - start) * 1000) & 0xFFFFFFFF
+
+
+class LossySocket:
+    """A non-blocking UDP socket that can drop, delay and reorder what it sends.
+
+    ``loss`` is the chance a packet is dropped, ``latency`` and ``jitter``
+    (seconds) the fixed and random extra delay of the rest; random delays
+    reorder packets like a real network does.  Call ``flush()`` often to
+    send what is due, or ``flush(everything=True)`` to send it all now.  Counts the bytes and packets going each way.
+    """
+
+    def __init__(self, bind=("0.0.0.0", 0), loss=0.0, latency=0.0, jitter=0.0, seed=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(bind)
+        self.sock.setblocking(False)
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.pending = []  # (due time, order, data, address)
+        self.order = 0
+        self.bytes_out = self.bytes_in = 0
+        self.packets_out = self.packets_in = 0
+        self.dropped = 0
+
+    def address(self):
+        return self.sock.getsockname()
+
+    def sendto(self, data, address):
+        self.bytes_out += len(data)
+        self.packets_out += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency + self.rng.uniform(0, self.jitter) if self.jitter else self.latency
+        if not delay:
+            self._send(data, address)
+            return
+        self.order += 1
+        heapq.heappush(self.pending, (time.perf_counter() + delay, self.order, data, address))
+
+    def _send(self, data, address):
+        try:
+            self.sock.sendto(data, address)
+        except OSError:
+            pass  # Nobody listening (yet): UDP loses it like any other packet
+
+    def flush(self, everything=False):
+        now = float("inf") if everything else time.perf_counter()
+        while self.pending and self.pending[0][0] <= now:
+            _, _, data, address = heapq.heappop(self.pending)
+            self._send(data, address)
+
+    def receive(self):
+        # Every packet waiting, as (data, address)
+        packets = []
+        while True:
+            try:
+                data, address = self.sock.recvfrom(65536)
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+            self.bytes_in += len(data)
+            self.packets_in += 1
+            packets.append((data, address))
+
+    def close(self):
+        self.sock.close()
+
+
+class Peer:
+    # The server's view of one connected client
+    __slots__ = ("address", "player", "last_seq", "queue", "held", "acked", "client_ms", "heard",
+                 "client_at", "rtt", "restart", "bytes_in", "bytes_out", "keyframes", "deltas", "inputs_lost")
+
+    def __init__(self, address, player):
+        self.address = address
+        self.player = player
+        self.last_seq = 0
+        self.queue = deque()
+        self.held = Inputs()  # Replayed when no new input has arrived in time
+        self.acked = 0
+        self.client_ms = 0  # Client clock of its newest input, echoed for the rtt
+        self.heard = self.client_at = time.perf_counter()
+        self.rtt = 0
+        self.restart = False
+        self.bytes_in = self.bytes_out = 0
+        self.keyframes = self.deltas = 0
+        self.inputs_lost = 0
+
+
+class Server:
+    def __init__(self, sock, state, send_every=2, max_queue=4):
+        self.sock = sock
+        self.state = state
+        self.send_every = send_every
+        self.max_queue = max_queue  # Inputs buffered per client; more only adds lag
+        self.peers = {}  # address -> Peer
+        self.tick = 0
+        self.history = {}  # tick -> (layout, vector)
+        self.events = 0
+        self.start = time.perf_counter()
+
+    def poll(self):
+        for data, address in self.sock.receive():
+            kind = data[0] if data else 0
+            peer = self.peers.get(address)
+            if kind == HELLO and len(data) == HELLO_PACKET.size:
+                self.join(data, address)
+            elif kind == INPUT and peer is not None and len(data) >= INPUT_PACKET.size:
+                self.receive_inputs(peer, data)
+            elif kind == BYE and peer is not None:
+                del self.peers[address]
+                print(f"Player {peer.player + 1} left")
+        now = time.perf_counter()
+        for address, peer in list(self.peers.items()):
+            if now - peer.heard > TIMEOUT:
+                del self.peers[address]
+                print(f"Player {peer.player + 1} timed out")
+
+    def join(self, data, address):
+        _, magic, protocol = HELLO_PACKET.unpack(data)
+        if magic != MAGIC or protocol != PROTOCOL:
+            return
+        peer = self.peers.get(address)
+        if peer is None:
+            taken = {peer.player for peer in self.peers.values()}
+            free = [player for player in range(MAX_PLAYERS) if player not in taken]
+            if not free:
+                return  # Full: the client gives up when no welcome comes
+            peer = self.peers[address] = Peer(address, free[0])
+            while len(self.state.wingmen) < peer.player:
+                add_wingman(self.state)
+            print(f"Player {peer.player + 1} joined from {address[0]}:{address[1]}")
+        # Sent again for every hello, in case the last welcome was lost
+        self.sock.sendto(WELCOME_PACKET.pack(WELCOME, peer.player, self.state.sim_hz, self.tick), address)
+
+    def receive_inputs(self, peer, data):
+        _, seq, acked, client_ms, rtt, count = INPUT_PACKET.unpack_from(data)
+        bits = data[INPUT_PACKET.size:INPUT_PACKET.size + count]
+        peer.heard = time.perf_counter()
+        peer.bytes_in += len(data)
+        if seq <= peer.last_seq:
+            return  # Late or duplicate
+        peer.acked = max(peer.acked, acked)
+        peer.client_ms = client_ms
+        peer.client_at = peer.heard
+        peer.rtt = rtt
+        first = seq - len(bits) + 1
+        if first > peer.last_seq + 1:
+            peer.inputs_lost += first - peer.last_seq - 1
+        for i, value in enumerate(bits):
+            if first + i > peer.last_seq:
+                peer.queue.append(value)
+                if value & RESTART:
+                    peer.restart = True
+        while len(peer.queue) > self.max_queue:
+            peer.queue.popleft()
+        peer.last_seq = seq
+
+    def advance(self):
+        """Run one simulation step with each player's next input."""
+        state = self.state
+        inputs = [None] * (len(state.wingmen) + 1)
+        for peer in self.peers.values():
+            if peer.queue:
+                peer.held = decode_inputs(peer.queue.popleft())
+            inputs[peer.player] = peer.held
+        if state.game_over and any(peer.restart for peer in self.peers.values()):
+            state.reset()
+        for peer in self.peers.values():
+            peer.restart = False
+        for name in step(state, inputs[0] or Inputs(), wingman_inputs=inputs[1:]):
+            self.events |= EVENT_BITS.get(name, 0)
+
+        self.tick += 1
+        self.history[self.tick] = encode_entities(state)
+        self.history.pop(self.tick - HISTORY, None)
+        if self.tick % self.send_every == 0:
+            self.send_snapshots()
+
+    def status(self, peer):
+        state = self.state
+        boss = state.boss
+        fields = STATUS.pack(
+            state.score, state.level, state.player_level, state.player_bullet_power,
+            max(-32768, state.player_health), state.player_max_health, state.game_over, boss is not None,
+            boss.health if boss else 0, boss.max_health if boss else 0,
+            int(state.player_pos[0] * SCALE), int(boss.x * SCALE) if boss else 0,
+            int(boss.y * SCALE) if boss else 0, peer.last_seq, self.events, len(state.wingmen))
+        return fields + b"".join(
+            WINGMAN_STATUS.pack(int(wingman.x * SCALE), max(-32768, wingman.health), wingman.down > 0)
+            for wingman in state.wingmen)
+
+    def send_snapshots(self):
+        layout, vector = self.history[self.tick]
+        now = time.perf_counter()
+        for peer in self.peers.values():
+            base = self.history.get(peer.acked)
+            if base is not None and base[0] != layout:
+                base = None  # A pool grew since: start over with a keyframe
+            hold = min(0xFFFF, int((now - peer.client_at) * 1000))
+            header = SNAPSHOT_PACKET.pack(SNAPSHOT, self.tick, peer.acked if base else 0,
+                                          peer.client_ms, hold, *layout)
+            packet = header + self.status(peer) + encode_delta(vector, base[1] if base else None)
+            if base:
+                peer.deltas += 1
+            else:
+                peer.keyframes += 1
+            peer.bytes_out += len(packet)
+            self.sock.sendto(packet, peer.address)
+        self.events = 0
+
+    def report(self):
+        elapsed = max(1e-9, time.perf_counter() - self.start)
+        lines = [f"tick {self.tick}, {len(self.peers)} players, out {self.sock.bytes_out / elapsed / 1024:.1f} KB/s"]
+        for peer in sorted(self.peers.values(), key=lambda peer: peer.player):
+            sent = peer.keyframes + peer.deltas
+            lines.append(
+                f"  P{peer.player + 1}: out {peer.bytes_out / elapsed / 1024:.1f} KB/s "
+                f"({peer.bytes_out / max(1, sent):.0f} B/snapshot, {peer.keyframes} keyframes), "
+                f"in {peer.bytes_in / elapsed / 1024:.1f} KB/s, rtt {peer.rtt} ms, "
+                f"inputs lost {peer.inputs_lost}")
+        return "\n".join(lines)
+
+
+class Client:
+    """Talks to a ``Server`` and keeps ``view``, a ``GameState`` to draw, in sync."""
+
+    def __init__(self, sock, server, interp_delay=6):
+        self.sock = sock
+        self.server = (socket.gethostbyname(server[0]), server[1])
+        self.interp_delay = interp_delay  # Steps drawn behind the newest snapshot
+        self.player = None
+        self.sim_hz = SIM_HZ
+        self.seq = 0
+        self.sent = deque(maxlen=INPUT_REDUNDANCY)
+        self.snapshots = {}  # tick -> (status, wingmen, layout, vector)
+        self.newest = 0
+        self.clock = None
+        self.start = time.perf_counter()
+        self.rtt = 0  # ms
+        self.rtts = deque(maxlen=1000)
+        self.jitter = 0.0  # seconds
+        self.events = []
+        self.view = GameState(0, waves=[])
+        self.shown = None  # Centres of the enemies drawn last frame, by slot
+        self.received = self.keyframes = self.undecodable = self.late = 0
+
+    def hello(self):
+        self.sock.sendto(HELLO_PACKET.pack(HELLO, MAGIC, PROTOCOL), self.server)
+
+    def connect(self, timeout=5.0):
+        # Say hello until welcomed; returns False if the server never answers
+        deadline = time.perf_counter() + timeout
+        while self.player is None and time.perf_counter() < deadline:
+            self.hello()
+            wait = time.perf_counter() + 0.25
+            while self.player is None and time.perf_counter() < wait:
+                self.poll()
+                time.sleep(0.005)
+        return self.player is not None
+
+    def send_input(self, inputs, restart=False):
+        self.seq += 1
+        self.sent.append(encode_inputs(inputs, restarted=restart))
+        packet = INPUT_PACKET.pack(INPUT, self.seq, self.newest, _clock_ms(self.start),
+                                   min(0xFFFF, self.rtt), len(self.sent)) + bytes(self.sent)
+        self.sock.sendto(packet, self.server)
+
+    def poll(self):
+        self.sock.flush()
+        for data, address in self.sock.receive():
+            if address != self.server or not data:
+                continue
+            if data[0] == SNAPSHOT and self.player is not None:
+                self.receive_snapshot(data)
+            elif data[0] == WELCOME and len(data) == WELCOME_PACKET.size and self.player is None:
+                _, self.player, self.sim_hz, _ = WELCOME_PACKET.unpack(data)
+                self.view = GameState(0, self.sim_hz, waves=[])
+
+    def receive_snapshot(self, data):
+        _, tick, base_tick, echoed, hold, *layout = SNAPSHOT_PACKET.unpack_from(data)
+        layout = tuple(layout)
+        at = SNAPSHOT_PACKET.size
+        status = STATUS.unpack_from(data, at)
+        at += STATUS.size
+        wingmen = []
+        for _ in range(status[-1]):
+            wingmen.append(WINGMAN_STATUS.unpack_from(data, at))
+            at += WINGMAN_STATUS.size
+        if tick in self.snapshots or tick <= self.newest - HISTORY:
+            self.late += 1
+            return
+        base = None
+        if base_tick:
+            base = self.snapshots.get(base_tick)
+            if base is None or base[2] != layout:
+                self.undecodable += 1
+                return
+            base = base[3]
+        else:
+            self.keyframes += 1
+        self.snapshots[tick] = (status, wingmen, layout, decode_delta(data[at:], base))
+        self.received += 1
+
+        # The server's tick 0 on our clock, smoothed; how much each
+        # snapshot's estimate strays from it is the jitter
+        origin = time.perf_counter() - tick / self.sim_hz
+        if self.clock is None:
+            self.clock = origin
+        self.jitter += (abs(origin - self.clock) - self.jitter) / 16
+        self.clock += (origin - self.clock) / 16
+        if tick > self.newest:
+            self.newest = tick
+            self.rtt = max(0, ((_clock_ms(self.start) - echoed) & 0xFFFFFFFF) - hold)
+            self.rtts.append(self.rtt)
+            for name, bit in EVENT_BITS.items():
+                if status[14] & bit:
+                    self.events.append(name)
+            for old in [t for t in self.snapshots if t <= tick - HISTORY]:
+                del self.snapshots[old]
+
+    def render_tick(self, now=None):
+        # The moment being drawn, in server ticks
+        if self.clock is None:
+            return 0.0
+        now = time.perf_counter() if now is None else now
+        return min(self.newest, (now - self.clock) * self.sim_hz - self.interp_delay)
+
+    def update_view(self, now=None):
+        """Bring ``view`` to the current render moment; returns the new events."""
+        events, self.events = self.events, []
+        if not self.snapshots:
+            return events
+        target = self.render_tick(now)
+        ticks = sorted(self.snapshots)
+        before = [t for t in ticks if t <= target]
+        after = [t for t in ticks if t > target]
+        a = before[-1] if before else ticks[0]
+        b = after[0] if after and before else a
+        alpha = 0.0 if a == b else (target - a) / (b - a)
+        self.fill_view(self.snapshots[a], self.snapshots[b], alpha, b - a)
+        return events
+
+    def fill_view(self, a, b, alpha, ticks):
+        view = self.view
+        status_a, _, layout_a, vector_a = a
+        status, wingmen, layout, vector = b
+        (view.score, view.level, view.player_level, view.player_bullet_power, view.player_health,
+         view.player_max_health, view.game_over, has_boss, boss_health, boss_max_health,
+         player_x, boss_x, boss_y, _, _, _) = status
+
+        def lerp(old, new):
+            return (old + (new - old) * alpha) / SCALE
+
+        view.player_prev_x = view.player_pos[0] = lerp(status_a[10], player_x)
+        view.boss = None
+        if has_boss:
+            boss = view.boss = Boss(view.boss_bullets, boss_max_health)
+            boss.health = boss_health
+            boss.prev_x = boss.x = lerp(status_a[11] if status_a[7] else boss_x, boss_x)
+            boss.y = boss_y / SCALE
+        while len(view.wingmen) < len(wingmen):
+            view.wingmen.append(Wingman(0))
+        del view.wingmen[len(wingmen):]
+        old_wingmen = a[1]
+        for i, (x, health, down) in enumerate(wingmen):
+            wingman = view.wingmen[i]
+            wingman.prev_x = wingman.x = lerp(old_wingmen[i][0] if i < len(old_wingmen) else x, x)
+            wingman.health = health
+            wingman.down = down
+
+        groups = split_entities(layout, vector)
+        old = split_entities(layout_a, vector_a) if layout_a == layout else groups
+        enemies = self.fill_pool(view.enemies, old["enemies"], groups["enemies"], alpha,
+                                 lambda kind: (ENEMY_SIZES[kind],) * 2)
+        self.fill_pool(view.bullets, old["bullets"], groups["bullets"], alpha,
+                       lambda kind: BULLET_SIZES[kind])
+        self.fill_pool(view.powerups, old["powerups"], groups["powerups"], alpha,
+                       lambda kind: (powerup_size, powerup_size))
+
+        # Boss bullets fly straight: back along their velocity from the newer snapshot
+        alive, x, y, dx, dy = groups["boss bullets"]
+        live = alive.astype(bool)
+        back = (1 - alpha) * ticks * view.dt
+        dx, dy = dx[live] / VELOCITY_SCALE, dy[live] / VELOCITY_SCALE
+        view.boss_bullets.clear()
+        view.boss_bullets.fire(x[live] / SCALE - dx * back, y[live] / SCALE - dy * back, dx, dy)
+
+        # Explosions are not sent: burst where an enemy that was drawn last
+        # frame has gone, unless it just fell off the bottom
+        if self.shown is not None:
+            for slot, (cx, cy) in self.shown.items():
+                if slot not in enemies and cy < view.player_pos[1] + player_size:
+                    view.particles.burst(cx, cy, BURST_SIZE)
+        self.shown = enemies
+        view.particles.update(view.dt)
+
+    def fill_pool(self, pool, old, new, alpha, size):
+        # Refill ``pool`` with the snapshot's live slots; returns their centres by slot
+        alive, x, y, kind = new
+        old_alive, old_x, old_y, old_kind = old
+        slots = np.flatnonzero(alive)
+        # A slot reused by something else between the two is not interpolated
+        same = (old_alive[slots] == 1) & (old_kind[slots] == kind[slots]) & (abs(old_y[slots] - y[slots]) < 100 * SCALE)
+        xs = np.where(same, old_x[slots] + (x[slots] - old_x[slots]) * alpha, x[slots]) / SCALE
+        ys = np.where(same, old_y[slots] + (y[slots] - old_y[slots]) * alpha, y[slots]) / SCALE
+        pool.clear()
+        centres = {}
+        for slot, px, py, k in zip(slots.tolist(), xs.tolist(), ys.tolist(), kind[slots].tolist()):
+            w, h = size(k)
+            pool.spawn(px, py, 0, w, h, k)
+            centres[slot] = (px + w / 2, py + h / 2)
+        return centres
+
+    def close(self):
+        # Not held back by the simulated latency: the socket is about to go
+        self.sock.sendto(BYE_PACKET.pack(BYE), self.server)
+        self.sock.flush(everything=True)
+
+    def report(self):
+        elapsed = max(1e-9, time.perf_counter() - self.start)
+        return (f"P{(self.player or 0) + 1}: in {self.sock.bytes_in / elapsed / 1024:.1f} KB/s, "
+                f"out {self.sock.bytes_out / elapsed / 1024:.1f} KB/s, {self.received} snapshots "
+                f"({self.keyframes} keyframes, {self.undecodable} undecodable, {self.late} late), "
+                f"rtt {self.rtt} ms, jitter {self.jitter * 1000:.1f} ms")
+
+
+def run_server(args):
+    state = GameState(args.seed, waves=load_waves(args.waves))
+    sock = LossySocket(("0.0.0.0", args.port), args.loss, args.latency, args.jitter)
+    server = Server(sock, state, args.send_every)
+    print(f"Serving on UDP port {args.port}, Ctrl+C to stop")
+    period = 1 / state.sim_hz
+    due = report = time.perf_counter()
+    try:
+        while True:
+            server.poll()
+            # The game waits while nobody is playing
+            now = time.perf_counter()
+            while due <= now:
+                if server.peers:
+                    server.advance()
+                due += period
+            sock.flush()
+            if now - report >= 5:
+                report = now
+                print(server.report())
+            time.sleep(max(0.0, min(due - time.perf_counter(), 0.002)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+
+
+def run_loopback(args):
+    """A server and ``--clients`` bots on 127.0.0.1, all in this process."""
+    from .balance import random_policy
+
+    state = GameState(args.seed, waves=load_waves(args.waves))
+    lossy = (args.loss, args.latency, args.jitter)
+    server = Server(LossySocket(("127.0.0.1", 0), *lossy, seed=args.seed), state, args.send_every)
+    clients = [Client(LossySocket(("127.0.0.1", 0), *lossy, seed=args.seed + 1 + i), server.sock.address())
+               for i in range(args.clients)]
+    policies = [random_policy(args.seed + i) for i in range(args.clients)]
+    sockets = [server.sock] + [client.sock for client in clients]
+
+    deadline = time.perf_counter() + 5
+    while any(client.player is None for client in clients):
+        if time.perf_counter() > deadline:
+            raise SystemExit("Not every client got in: is the loss too high?")
+        for client in clients:
+            if client.player is None:
+                client.hello()
+        for _ in range(20):
+            for sock in sockets:
+                sock.flush()
+            server.poll()
+            for client in clients:
+                client.poll()
+            time.sleep(0.005)
+
+    period = 1 / state.sim_hz
+    start = due = time.perf_counter()
+    mismatched = checked = 0
+    while server.tick < args.seconds * state.sim_hz:
+        for client, policy in zip(clients, policies):
+            client.poll()
+            client.update_view()
+            client.send_input(policy(client.view), restart=client.view.game_over)
+        server.poll()
+        server.advance()
+        for sock in sockets:
+            sock.flush()
+        # Every snapshot a client decoded must be exactly what the server sent
+        for client in clients:
+            tick = client.newest
+            if tick in server.history and tick in client.snapshots:
+                checked += 1
+                layout, vector = server.history[tick]
+                _, _, client_layout, client_vector = client.snapshots[tick]
+                if client_layout != layout or not np.array_equal(client_vector, vector):
+                    mismatched += 1
+        due += period
+        time.sleep(max(0.0, due - time.perf_counter()))
+
+    elapsed = time.perf_counter() - start
+    print(f"{server.tick} ticks in {elapsed:.1f}s, {len(clients)} clients, loss {args.loss:.0%}, "
+          f"latency {args.latency * 1000:.0f} ms + up to {args.jitter * 1000:.0f} ms jitter")
+    print(server.report())
+    for client in clients:
+        print(client.report())
+        if client.rtts:
+            rtts = sorted(client.rtts)
+            print(f"    rtt median {rtts[len(rtts) // 2]} ms, p95 {rtts[int(len(rtts) * 0.95)]} ms")
+    print(f"Decoded snapshots matching the server: {checked - mismatched}/{checked}")
+    for client in clients:
+        client.close()
+    for sock in sockets:
+        sock.close()
+    if mismatched:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Co-op server, and a local test of it")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run a server for cabinets to --connect to")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"UDP port (default {DEFAULT_PORT})")
+    loopback = commands.add_parser("loopback", help="server and bot clients over 127.0.0.1")
+    loopback.add_argument("--clients", type=int, default=MAX_PLAYERS, help=f"bots (default {MAX_PLAYERS})")
+    loopback.add_argument("--seconds", type=float, default=20, help="game time to play (default 20)")
+    for command in (serve, loopback):
+        command.add_argument("--seed", type=int, default=0, help="game seed")
+        command.add_argument("--waves", metavar="FILE", default=DEFAULT_WAVES, help="wave file to play")
+        command.add_argument("--send-every", type=int, default=2,
+                             help="steps between snapshots (default 2)")
+        command.add_argument("--loss", type=float, default=0.0, help="chance of dropping a packet sent")
+        command.add_argument("--latency", type=float, default=0.0, help="seconds added to every packet sent")
+        command.add_argument("--jitter", type=float, default=0.0,
+                             help="up to this many more seconds, at random")
+    args = parser.parse_args()
+    if args.command == "loopback" and not 1 <= args.clients <= MAX_PLAYERS:
+        parser.error(f"--clients must be 1 to {MAX_PLAYERS}")
+    if args.command == "serve":
+        run_server(args)
+    else:
+        run_loopback(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Pooled explosion particles.
+
+All particles live in one ``ParticleEmitter``: fixed-capacity NumPy columns
+for position, velocity, remaining life, size and colour.  Live particles are
+kept packed at the front of the arrays; every update integrates them in one
+batch and swap-removes the ones whose life ran out.
+"""
+import numpy as np
+
+from .entities import swap_remove
+
+# Particles per burst, as the old Explosion used
+BURST_SIZE = 15
+
+# Particle colours are picked from a fixed palette of fiery tones so the
+# renderer can cache one sprite per size, colour and fade step
+PALETTE_SIZE = 32
+
+
+def make_palette(rng):
+    return np.stack([
+        rng.integers(200, 256, PALETTE_SIZE),
+        rng.integers(100, 201, PALETTE_SIZE),
+        rng.integers(0, 101, PALETTE_SIZE),
+    ], axis=1).astype(np.uint8)
+
+
+class ParticleEmitter:
+    __slots__ = ("capacity", "count", "x", "y", "dx", "dy", "life", "size", "color", "rng", "palette")
+
+    def __init__(self, capacity=4096, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.life = np.zeros(capacity)  # Frames at 60 Hz
+        self.size = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros(capacity, dtype=np.int16)  # Index into the palette
+        self.rng = np.random.default_rng(seed)
+        self.palette = make_palette(np.random.default_rng(0))
+
+    def burst(self, x, y, count=BURST_SIZE):
+        # When the pool is full the extra particles are simply dropped
+        start = self.count
+        count = min(count, self.capacity - start)
+        if count <= 0:
+            return
+        end = start + count
+        rng = self.rng
+        angle = rng.uniform(0, np.pi * 2, count)
+        speed = rng.uniform(1, 5, count)
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.dx[start:end] = np.cos(angle) * speed
+        self.dy[start:end] = np.sin(angle) * speed
+        self.life[start:end] = rng.integers(10, 21, count)
+        self.size[start:end] = rng.integers(2, 6, count)
+        self.color[start:end] = rng.integers(0, PALETTE_SIZE, count)
+        self.count = end
+
+    def update(self, dt=1.0):
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.dx[:n] * dt
+        self.y[:n] += self.dy[:n] * dt
+        self.life[:n] -= dt
+
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if len(dead):
+            columns = (self.x, self.y, self.dx, self.dy, self.life, self.size, self.color)
+            self.count = swap_remove(columns, n, dead)
+
+    def clear(self):
+        self.count = 0
+
+    def stats(self):
+        return self.count, self.capacity - self.count
+
+    def alpha(self):
+        # Particles fade out over their last frames
+        return np.minimum(255, np.ceil(self.life[:self.count]).astype(np.int32) * 12)
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,128 @@
+"""Pipelined frames: the next frame simulates on a worker thread while the
+main thread draws the one before.
+
+Drawing reads a copy of the game, not the game itself.  There are two
+copies: the worker fills the back one once its steps are done, and the
+main thread draws the front one, so neither waits on the other until the
+end of the frame, when they swap.  Pygame's display calls stay on the main
+thread.  What is drawn is one frame behind the simulation.
+
+Most of a frame's drawing is SDL blitting, which runs with the GIL
+released, as do NumPy's column updates, so the two halves really overlap
+on a multi-core machine; a frame then costs about the slower of the two
+instead of their sum.
+"""
+import queue
+import threading
+
+import numpy as np
+
+from .core import Boss, GameState, Wingman
+
+ENTITY_COLUMNS = ("x", "y", "speed", "w", "h", "kind", "power", "alive")
+PROJECTILE_COLUMNS = ("x", "y", "dx", "dy")
+PARTICLE_COLUMNS = PROJECTILE_COLUMNS + ("life", "size", "color")
+
+
+def _copy_columns(src, dst, names, count):
+    # The first ``count`` rows; the copy grows along with the source
+    if dst.capacity != src.capacity:
+        for name in names:
+            setattr(dst, name, np.zeros(src.capacity, dtype=getattr(src, name).dtype))
+        dst.capacity = src.capacity
+    for name in names:
+        np.copyto(getattr(dst, name)[:count], getattr(src, name)[:count])
+
+
+def copy_frame(src, dst):
+    """Copy everything the renderer reads from ``src`` into the ``GameState`` ``dst``."""
+    dst.player_pos = list(src.player_pos)
+    for name in ("player_prev_x", "player_health", "player_max_health", "player_level",
+                 "player_bullet_power", "score", "level", "game_over", "frame"):
+        setattr(dst, name, getattr(src, name))
+
+    dst.boss = None
+    if src.boss is not None:
+        boss = dst.boss = Boss(dst.boss_bullets)
+        for name in Boss.__slots__:
+            if name != "bullets":
+                setattr(boss, name, getattr(src.boss, name))
+
+    del dst.wingmen[len(src.wingmen):]
+    while len(dst.wingmen) < len(src.wingmen):
+        dst.wingmen.append(Wingman(0))
+    for wingman, copy in zip(src.wingmen, dst.wingmen):
+        for name in Wingman.__slots__:
+            setattr(copy, name, getattr(wingman, name))
+
+    for name in ("enemies", "bullets", "powerups"):
+        pool, copy = getattr(src, name), getattr(dst, name)
+        _copy_columns(pool, copy, ENTITY_COLUMNS, pool.capacity)
+        copy.free = list(pool.free)
+    for name, columns in (("boss_bullets", PROJECTILE_COLUMNS), ("particles", PARTICLE_COLUMNS)):
+        pool, copy = getattr(src, name), getattr(dst, name)
+        _copy_columns(pool, copy, columns, pool.count)
+        copy.count = pool.count
+
+
+class SimWorker:
+    """Runs each frame's simulation on a worker thread, drawn from a double buffer.
+
+    ``start(job, *args)`` hands ``job`` to the worker, which runs it and
+    copies ``state`` into the back buffer.  Meanwhile draw ``front`` and
+    leave ``state`` alone.  ``finish()`` waits for the worker, swaps the
+    buffers and returns what ``job`` returned (or raises what it raised).
+    Between ``finish()`` and the next ``start()`` the worker is idle and
+    ``state`` is the main thread's again; call ``sync()`` after changing it
+    there so the next frame drawn shows the change.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.front = GameState(0, state.sim_hz, waves=[])
+        self.back = GameState(0, state.sim_hz, waves=[])
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.busy = False
+        self.sync()
+        self.thread = threading.Thread(target=self.run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def sync(self):
+        copy_frame(self.state, self.front)
+
+    def run(self):
+        # Runs on the worker thread until close() queues None
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            job, args = job
+            try:
+                result = job(*args)
+                copy_frame(self.state, self.back)
+            except BaseException as e:
+                self.results.put((False, e))
+            else:
+                self.results.put((True, result))
+
+    def start(self, job, *args):
+        if self.busy:
+            raise RuntimeError("the last frame has not finished")
+        self.busy = True
+        self.jobs.put((job, args))
+
+    def finish(self):
+        ok, result = self.results.get()
+        self.busy = False
+        if not ok:
+            raise result
+        self.front, self.back = self.back, self.front
+        return result
+
+    def close(self):
+        if self.busy:
+            self.results.get()
+            self.busy = False
+        self.jobs.put(None)
+        self.thread.join()
@@ -0,0 +1,134 @@
+"""Per-phase frame timing.
+
+The main loop, ``step()`` and the renderer call ``lap(name)`` at the end of
+each phase; the time since the previous lap is charged to that phase.  The
+profiler keeps a rolling window of recent frames for percentiles (shown by
+the in-game overlay) and, optionally, the whole session as a trace that can
+be saved as CSV or JSON.  ``game_summary()`` covers every frame since the
+last ``start_game()``, for logging one game as a whole.
+"""
+import csv
+import json
+from array import array
+from collections import deque
+from time import perf_counter_ns
+
+
+class NullProfiler:
+    # Stand-in when nobody is measuring, so callers never have to check
+    def begin_frame(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+    def end_frame(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    def __init__(self, window=300, keep_trace=False):
+        self.window = window
+        self.keep_trace = keep_trace
+        self.phases = []       # Phase names in the order they were first seen
+        self.recent = {}       # name -> deque of the last ``window`` frames, ns
+        self.trace = {}        # name -> array of every frame, ns
+        self.frames = 0
+        self.game = {}         # name -> array of every frame since start_game(), ns
+        self.game_frames = 0
+        self.current = {}
+        self.frame_start = 0
+        self.last = 0
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = self.last = perf_counter_ns()
+
+    def lap(self, name):
+        now = perf_counter_ns()
+        self.current[name] = self.current.get(name, 0) + now - self.last
+        self.last = now
+
+    def add_phases(self, phases):
+        # Charge time measured elsewhere (name -> ns), e.g. on another thread,
+        # to this frame; it does not count towards the frame total
+        for name, ns in phases.items():
+            self.current[name] = self.current.get(name, 0) + ns
+
+    def start_game(self):
+        self.game = {}
+        self.game_frames = 0
+
+    def end_frame(self):
+        current = self.current
+        current["frame"] = self.last - self.frame_start
+        for name in current:
+            if name not in self.recent:
+                self.phases.append(name)
+                self.recent[name] = deque(maxlen=self.window)
+                if self.keep_trace:
+                    # Phases first seen mid-session read as zero before that
+                    self.trace[name] = array("q", bytes(8 * self.frames))
+        for name in self.phases:
+            value = current.get(name, 0)
+            self.recent[name].append(value)
+            if self.keep_trace:
+                self.trace[name].append(value)
+            if name not in self.game:
+                self.game[name] = array("q", bytes(8 * self.game_frames))
+            self.game[name].append(value)
+        self.frames += 1
+        self.game_frames += 1
+
+    def percentile(self, name, pct):
+        samples = sorted(self.recent.get(name, ()))
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(len(samples) * pct / 100))
+        return samples[index] / 1e6
+
+    def summary(self):
+        # (phase, p50 ms, p99 ms, mean ms) over the rolling window
+        rows = []
+        for name in self.phases:
+            samples = self.recent[name]
+            mean = sum(samples) / len(samples) / 1e6 if samples else 0.0
+            rows.append((name, self.percentile(name, 50), self.percentile(name, 99), mean))
+        return rows
+
+    def game_summary(self):
+        # (phase, p50 ms, p99 ms, mean ms) over every frame since start_game()
+        rows = []
+        for name in self.phases:
+            samples = sorted(self.game.get(name, ()))
+            if not samples:
+                continue
+            p50 = samples[min(len(samples) - 1, len(samples) // 2)]
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            rows.append((name, p50 / 1e6, p99 / 1e6, sum(samples) / len(samples) / 1e6))
+        return rows
+
+    def save(self, path):
+        """Write the session trace, CSV or JSON depending on the extension."""
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({
+                    "unit": "ns",
+                    "phases": self.phases,
+                    "frames": {name: self.trace[name].tolist() for name in self.phases},
+                    "summary_ms": [
+                        {"phase": name, "p50": p50, "p99": p99, "mean": mean}
+                        for name, p50, p99, mean in self.summary()
+                    ],
+                }, f)
+            return
+
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_ns" for name in self.phases])
+            columns = [self.trace[name] for name in self.phases]
+            for i in range(self.frames):
+                writer.writerow([i] + [column[i] for column in columns])
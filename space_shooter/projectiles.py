@@ -0,0 +1,113 @@
+"""Pooled enemy projectiles and the fire patterns built on them.
+
+Boss bullets live in one ``ProjectilePool``: NumPy columns for position and
+velocity, with the live bullets packed at the front like the particles.  An
+update moves every bullet along its own ``(dx, dy)`` in one batch, drops the
+ones that left the playfield on any side, and the player is tested against
+the paths all of them took this step at once.
+
+The patterns only add bullets to a pool; they know nothing about the boss.
+"""
+import math
+
+import numpy as np
+
+from .collision import swept_circle_overlaps
+from .entities import swap_remove
+
+
+class ProjectilePool:
+    __slots__ = ("width", "height", "radius", "margin", "capacity", "count", "x", "y", "dx", "dy")
+
+    def __init__(self, width, height, radius=4, margin=16, capacity=256):
+        self.width = width
+        self.height = height
+        self.radius = radius  # Hit radius, the same for every bullet
+        self.margin = margin  # How far off screen a bullet may go before it is dropped
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name in ("x", "y", "dx", "dy"):
+            column = np.zeros(capacity)
+            column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def fire(self, x, y, dx, dy):
+        # x, y, dx and dy may be numbers or arrays of one value per bullet
+        dx, dy = np.broadcast_arrays(np.asarray(dx, dtype=float), np.asarray(dy, dtype=float))
+        count = dx.size
+        start = self.count
+        end = start + count
+        if end > self.capacity:
+            self._grow(end)
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.dx[start:end] = dx.ravel()
+        self.dy[start:end] = dy.ravel()
+        self.count = end
+
+    def update(self, dt=1.0):
+        n = self.count
+        if not n:
+            return
+        x, y = self.x[:n], self.y[:n]
+        x += self.dx[:n] * dt
+        y += self.dy[:n] * dt
+        margin = self.margin
+        self._remove((x <= -margin) | (x >= self.width + margin) | (y <= -margin) | (y >= self.height + margin))
+
+    def hits(self, rect, dt=1.0, rect_dx=0.0, rect_dy=0.0):
+        """Remove the bullets that hit ``rect`` this step and return how many there were.
+
+        Call after ``update(dt)``; ``rect_dx``, ``rect_dy`` is how far the
+        rect itself moved this step.
+        """
+        n = self.count
+        if not n:
+            return 0
+        hit = swept_circle_overlaps(self.x[:n], self.y[:n], self.dx[:n] * dt - rect_dx,
+                                    self.dy[:n] * dt - rect_dy, self.radius, rect)
+        self._remove(hit)
+        return n - self.count
+
+    def _remove(self, mask):
+        dead = np.flatnonzero(mask)
+        if len(dead):
+            self.count = swap_remove((self.x, self.y, self.dx, self.dy), self.count, dead)
+
+    def stats(self):
+        return self.count, self.capacity - self.count
+
+    def clear(self):
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+
+def spread(pool, x, y, speed=5, angles=range(-30, 31, 15)):
+    # A fan of bullets around straight down, angles in degrees
+    rad = np.radians(np.asarray(angles, dtype=float))
+    pool.fire(x, y, np.sin(rad) * speed, np.cos(rad) * speed)
+
+
+def spiral(pool, x, y, angle, arms=6, speed=3):
+    # Evenly spaced arms starting at ``angle`` degrees; advance the angle
+    # between calls to turn the ring into a spiral
+    rad = np.radians(angle + np.arange(arms) * (360 / arms))
+    pool.fire(x, y, np.sin(rad) * speed, np.cos(rad) * speed)
+
+
+def aimed(pool, x, y, target_x, target_y, speed=6, count=3, gap=8):
+    # A tight fan of ``count`` bullets centred on the target, ``gap`` degrees apart
+    heading = math.degrees(math.atan2(target_x - x, target_y - y))
+    spread(pool, x, y, speed, heading + (np.arange(count) - (count - 1) / 2) * gap)
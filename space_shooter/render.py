@@ -0,0 +1,353 @@
+"""Pygame renderer for a ``GameState``.
+
+All drawing lives here so the simulation in ``core`` can run without a
+display.  The renderer only reads the state, it never advances it.
+
+In dirty-rect mode the background stays still and the renderer remembers the
+screen area of everything it drew.  The next frame it paints the background
+back over those areas only, and ``present()`` pushes just the areas that
+changed instead of the whole window.
+
+The simulation may step at a different rate from the display.  ``draw()``
+takes how far the next step is along (``alpha``, 0 to 1) and draws everything
+that far between where the last step moved it from and where it is now.
+"""
+import pygame
+
+from .core import WIDTH, HEIGHT, WHITE, RED, GREEN, YELLOW, player_size
+from .profiler import NULL_PROFILER
+from .sprites import SpriteAtlas
+from .starfield import Starfield
+from .text_cache import HudText, TextCache
+
+
+class Renderer:
+    def __init__(self, screen, star_layers=3, star_density=100, dirty_rects=False, assets=None):
+        self.screen = screen
+
+        # Fonts, through the asset cache when there is one
+        font = assets.font if assets is not None else pygame.font.SysFont
+        self.font_large = font("Arial", 48, bold=True)
+        self.font_medium = font("Arial", 35)
+        self.font_small = font("Arial", 24)
+        self.font_tiny = font("Arial", 18)
+
+        # Text surfaces: an LRU cache for labels, and HUD lines that only
+        # re-render when their value changes
+        self.text_cache = TextCache()
+        self.hud_score = HudText(self.font_small, "Score: {}", WHITE)
+        self.hud_level = HudText(self.font_small, "Level: {}", WHITE)
+        self.hud_player_level = HudText(self.font_small, "Ship Level: {}", WHITE)
+        self.hud_health = HudText(self.font_small, "Health: {}/{}", WHITE)
+        self.hud_power = HudText(self.font_small, "Bullet Power: {}", WHITE)
+        self.hud_boss_health = HudText(self.font_small, "BOSS: {}/{}", WHITE)
+
+        # Ships, bullets and power-ups are drawn once up front
+        self.atlas = SpriteAtlas(self.font_small)
+
+        # Particle sprites keyed by (radius, palette index, fade step)
+        self.particle_sprites = {}
+
+        # Parallax starfield, pre-rendered into one surface per speed band
+        self.starfield = Starfield(WIDTH, HEIGHT, star_layers, star_density)
+
+        # Dirty-rect tracking: a frozen copy of the starfield to erase with,
+        # the areas drawn this frame and the areas to present
+        self.dirty_rects = dirty_rects
+        self.background = None
+        if dirty_rects:
+            self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+            self.starfield.draw(self.background)
+        self.drawn = []
+        self.dirty = None  # None means the whole screen
+        self.max_dirty = 256  # Past this many rects a full update is cheaper
+
+        # Profiler overlay, rebuilt a few times a second rather than every frame
+        self.profiler_surface = None
+        self.profiler_age = 0
+
+        # The pause and game-over screens do not move: (name, surface) of the
+        # last one composed, blitted as is until the game moves again
+        self.scene = None
+
+        # Shown on the game-over screen, set by whoever keeps the scores
+        self.high_score = None
+        self.new_high_score = False
+
+    def blit(self, surface, pos):
+        rect = self.screen.blit(surface, pos)
+        if self.dirty_rects:
+            self.drawn.append(rect)
+
+    def blits(self, batch):
+        if self.dirty_rects:
+            self.drawn.extend(self.screen.blits(batch))
+        else:
+            self.screen.blits(batch, doreturn=False)
+
+    def rect(self, color, rect, width=0):
+        drawn = pygame.draw.rect(self.screen, color, rect, width)
+        if self.dirty_rects:
+            self.drawn.append(drawn)
+
+    def invalidate(self):
+        # Anything drawn outside the tracked helpers (overlays, the pause
+        # text) makes the next frame repaint and present the whole screen
+        self.dirty = None
+
+    def clear(self, dt=1.0):
+        screen = self.screen
+        if not self.dirty_rects:
+            # Draw background, the starfield also clears the screen
+            self.starfield.update(dt)
+            self.starfield.draw(screen)
+            return
+
+        if self.dirty is None:
+            screen.blit(self.background, (0, 0))
+            self.dirty = []
+        else:
+            # Erase last frame's sprites and present those areas too
+            screen.blits([(self.background, rect, rect) for rect in self.drawn], doreturn=False)
+            self.dirty = self.drawn
+        self.drawn = []
+
+    def present(self):
+        if self.dirty_rects and self.dirty is not None:
+            rects = self.dirty + self.drawn
+            if len(rects) <= self.max_dirty:
+                pygame.display.update(rects)
+                return
+        pygame.display.update()
+
+    def draw(self, state, profiler=NULL_PROFILER, alpha=1.0, dt=1.0):
+        """Draw ``state`` as of ``alpha`` of the way through its last step.
+
+        ``dt`` is the time since the last draw in 60 Hz frames, for the
+        starfield.
+        """
+        self.clear(dt)
+        profiler.lap("draw background")
+
+        # Nothing moves once the game is over
+        if state.game_over:
+            alpha = 1.0
+        # How far back from the current positions to draw, in 60 Hz frames
+        back = (1.0 - alpha) * state.dt
+
+        # Draw player and any co-op wingmen
+        self.draw_player(state, alpha)
+        if state.wingmen:
+            self.draw_wingmen(state, alpha)
+        profiler.lap("draw player")
+
+        # Draw enemies
+        atlas = self.atlas
+        enemies = state.enemies
+        live = enemies.live()
+        ys = enemies.y[live] - enemies.speed[live] * back
+        self.blits(atlas.batch(atlas.enemies, enemies.x[live].astype(int).tolist(),
+                               ys.astype(int).tolist(), enemies.kind[live].tolist()))
+        profiler.lap("draw enemies")
+
+        # Draw boss and its bullets
+        if state.boss:
+            self.draw_boss(state.boss, alpha)
+        self.draw_boss_bullets(state.boss_bullets, back)
+        profiler.lap("draw boss")
+
+        # Draw bullets
+        bullets = state.bullets
+        live = bullets.live()
+        ys = bullets.y[live] + bullets.speed[live] * back
+        self.blits(atlas.batch(atlas.bullets, bullets.x[live].astype(int).tolist(),
+                               ys.astype(int).tolist(), bullets.kind[live].tolist()))
+        profiler.lap("draw bullets")
+
+        # Draw power-ups
+        powerups = state.powerups
+        live = powerups.live()
+        ys = powerups.y[live] - powerups.speed[live] * back
+        self.blits(atlas.batch(atlas.powerups, powerups.x[live].astype(int).tolist(),
+                               ys.astype(int).tolist(), powerups.kind[live].tolist()))
+        profiler.lap("draw powerups")
+
+        # Draw explosions
+        self.draw_particles(state.particles, back)
+        profiler.lap("draw explosions")
+
+        # Draw HUD
+        self.show_hud(state)
+
+        # Show game over screen if game is over
+        if state.game_over:
+            self.show_game_over(state)
+        else:
+            self.scene = None
+        profiler.lap("draw hud")
+
+    def draw_player(self, state, alpha=1.0):
+        x, y = state.player_pos
+        x = int(state.player_prev_x + (x - state.player_prev_x) * alpha)
+        size = player_size
+        sprite, ox, oy = self.atlas.player_sprite(state.player_level)
+        self.blit(sprite, (x + ox, y + oy))
+
+        # Draw level indicator
+        if state.player_level > 1:
+            level_text = self.text_cache.render(self.font_tiny, f"Lv.{state.player_level}", WHITE)
+            self.blit(level_text, (x + size//2 - level_text.get_width()//2, y + size + 5))
+
+    def draw_wingmen(self, state, alpha=1.0):
+        # Same ship as the player, with a health bar and its player number
+        y = state.player_pos[1]
+        size = player_size
+        sprite, ox, oy = self.atlas.player_sprite(state.player_level)
+        for i, wingman in enumerate(state.wingmen):
+            if wingman.down:
+                continue
+            x = int(wingman.prev_x + (wingman.x - wingman.prev_x) * alpha)
+            self.blit(sprite, (x + ox, y + oy))
+            health = max(0, wingman.health) / state.player_max_health
+            self.rect(RED, (x, y + size + 5, size, 4))
+            self.rect(GREEN, (x, y + size + 5, int(size * health), 4))
+            label = self.text_cache.render(self.font_tiny, f"P{i + 2}", WHITE)
+            self.blit(label, (x + size//2 - label.get_width()//2, y + size + 12))
+
+    def draw_boss(self, boss, alpha=1.0):
+        sprite, ox, oy = self.atlas.boss
+        x = int(boss.prev_x + (boss.x - boss.prev_x) * alpha)
+        self.blit(sprite, (x + ox, boss.y + oy))
+
+        # Draw boss health bar
+        bar_width = 200
+        self.rect(RED, (WIDTH//2 - bar_width//2, 20, bar_width, 20))
+        health_width = int(bar_width * (boss.health / boss.max_health))
+        self.rect(GREEN, (WIDTH//2 - bar_width//2, 20, health_width, 20))
+        self.rect(WHITE, (WIDTH//2 - bar_width//2, 20, bar_width, 20), 2)
+
+        # Boss health text
+        health_text = self.hud_boss_health.render(boss.health, boss.max_health)
+        self.blit(health_text, (WIDTH//2 - health_text.get_width()//2, 45))
+
+    def draw_boss_bullets(self, bullets, back=0.0):
+        n = len(bullets)
+        if not n:
+            return
+        sprite, ox, oy = self.atlas.boss_bullet
+        xs = (bullets.x[:n] - bullets.dx[:n] * back + ox).astype(int).tolist()
+        ys = (bullets.y[:n] - bullets.dy[:n] * back + oy).astype(int).tolist()
+        self.blits([(sprite, pos) for pos in zip(xs, ys)])
+
+    def draw_particles(self, particles, back=0.0):
+        # All live particles go to the screen in a single blits() call
+        n = len(particles)
+        if not n:
+            return
+        sizes = particles.size[:n]
+        xs = (particles.x[:n] - particles.dx[:n] * back - sizes).astype(int).tolist()
+        ys = (particles.y[:n] - particles.dy[:n] * back - sizes).astype(int).tolist()
+        fades = (particles.alpha() // 16).tolist()
+        sprites = self.particle_sprites
+        batch = []
+        for x, y, size, color, fade in zip(xs, ys, sizes.tolist(), particles.color[:n].tolist(), fades):
+            key = (size, color, fade)
+            sprite = sprites.get(key)
+            if sprite is None:
+                sprite = sprites[key] = self.make_particle_sprite(particles.palette[color], size, fade)
+            batch.append((sprite, (x, y)))
+        self.blits(batch)
+
+    def make_particle_sprite(self, color, size, fade):
+        sprite = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+        r, g, b = color.tolist()
+        pygame.draw.circle(sprite, (r, g, b, min(255, fade * 16 + 15)), (size, size), size)
+        return sprite
+
+    def draw_profiler(self, profiler, state=None):
+        # Rolling p50/p99 per phase and the entity pools, refreshed every 30 frames
+        self.profiler_age -= 1
+        if self.profiler_surface is None or self.profiler_age <= 0:
+            self.profiler_age = 30
+            rows = [("phase", "p50", "p99")]
+            rows += [(name, f"{p50:.2f}", f"{p99:.2f}") for name, p50, p99, _ in profiler.summary()]
+            if state is not None:
+                rows.append(("pool", "live", "free"))
+                rows += [(name, str(live), str(free)) for name, (live, free) in state.pool_stats().items()]
+            line = self.font_tiny.get_linesize()
+            surface = pygame.Surface((250, line * len(rows) + 10), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 170))
+            for i, row in enumerate(rows):
+                for column, x in zip(row, (5, 160, 205)):
+                    surface.blit(self.font_tiny.render(column, True, WHITE), (x, 5 + i * line))
+            self.profiler_surface = surface
+        self.blit(self.profiler_surface, (20, 115))
+
+    def show_scene(self, name, draw, *args):
+        # Compose a still screen over whatever is showing, once
+        if self.scene is None or self.scene[0] != name:
+            draw(*args)
+            self.scene = (name, self.screen.copy())
+        else:
+            self.screen.blit(self.scene[1], (0, 0))
+        self.invalidate()
+
+    def show_pause(self):
+        self.show_scene("paused", self.draw_pause)
+
+    def draw_pause(self):
+        # Display pause message
+        pause_text = self.text_cache.render(self.font_large, "PAUSED", WHITE)
+        self.screen.blit(pause_text, (WIDTH//2 - pause_text.get_width()//2, HEIGHT//2 - 50))
+
+    def show_game_over(self, state):
+        self.show_scene("game over", self.draw_game_over, state)
+
+    def draw_game_over(self, state):
+        screen = self.screen
+        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))
+        screen.blit(overlay, (0, 0))
+
+        text = self.text_cache.render(self.font_large, "GAME OVER", RED)
+        screen.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT//2 - 50))
+
+        score_text = self.text_cache.render(self.font_medium, f"Final Score: {state.score}", WHITE)
+        screen.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2 + 20))
+
+        if self.high_score is not None:
+            if self.new_high_score:
+                high_text = self.text_cache.render(self.font_small, "New High Score!", YELLOW)
+            else:
+                high_text = self.text_cache.render(self.font_small, f"High Score: {self.high_score}", WHITE)
+            screen.blit(high_text, (WIDTH//2 - high_text.get_width()//2, HEIGHT//2 + 60))
+
+        restart_text = self.text_cache.render(self.font_small, "Press R to restart or Q to quit", WHITE)
+        screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 100))
+
+    def show_hud(self, state):
+        # Score
+        score_text = self.hud_score.render(state.score)
+        self.blit(score_text, (20, 20))
+
+        # Level
+        level_text = self.hud_level.render(state.level)
+        self.blit(level_text, (20, 50))
+
+        # Player level
+        player_level_text = self.hud_player_level.render(state.player_level)
+        self.blit(player_level_text, (20, 80))
+
+        # Health bar
+        self.rect(RED, (WIDTH - 220, 20, 200, 20))
+        health_width = int(200 * (state.player_health / state.player_max_health))
+        self.rect(GREEN, (WIDTH - 220, 20, health_width, 20))
+        self.rect(WHITE, (WIDTH - 220, 20, 200, 20), 2)
+
+        # Health text
+        health_text = self.hud_health.render(state.player_health, state.player_max_health)
+        self.blit(health_text, (WIDTH - 220, 45))
+
+        # Bullet power
+        power_text = self.hud_power.render(state.player_bullet_power)
+        self.blit(power_text, (WIDTH - 220, 70))
@@ -0,0 +1,288 @@
+"""Binary snapshots of a whole game, for rewinding, saving and branching.
+
+``snapshot(state)`` packs everything that changes during play into one
+``bytes``: the player and any wingmen, score and timers, the boss, every
+entity pool, the spawn schedule and both random generators.
+``restore(state, data)`` puts it back into a ``GameState`` created with the
+same step rate, wave file and tuning (those are settings, not part of the
+snapshot), after which the game plays on exactly as it would have from the
+moment of the snapshot.
+
+The layout is fixed ``struct`` records for the scalars followed by the live
+rows of each pool as raw NumPy columns, each section prefixed by its row
+count.  Dead pool slots are left out, so a snapshot is a few KB and taking
+one costs far less than a step; ``SnapshotRing`` keeps one per frame for
+the last few seconds.
+
+A boss gets its attack script back from the wave event that spawned it.
+"""
+import os
+import struct
+
+import numpy as np
+
+from .core import BOSS_SCRIPT, Boss, Wingman, boss_script
+
+MAGIC = b"SSSN"
+VERSION = 2
+# magic, version, step rate
+HEADER = struct.Struct("<4sBH")
+# player x, y, previous x, health, max health, ship level, bullet power,
+# bullet cooldown, cooldown max, score, level, bosses killed, game over,
+# frame, boss wave (-1 for none), wave clock, has boss
+GAME = struct.Struct("<dddddddddqqq?qid?")
+# x, y, size, health, max health, speed, direction, attack timer, attack
+# delay, phase, script position, spiral angle, previous x
+BOSS = struct.Struct("<ddidddiddiidd")
+# x, previous x, health, cooldown, frames until back
+WINGMAN = struct.Struct("<ddddd")
+# Python's Mersenne Twister: 624 words, position, cached gauss (NaN for none)
+MT_STATE = struct.Struct("<625Id")
+# NumPy's PCG64: state and increment as 64-bit halves, buffered 32 bits
+PCG_STATE = struct.Struct("<4QBI")
+COUNT = struct.Struct("<II")
+
+ENTITY_COLUMNS = (("x", "<f8"), ("y", "<f8"), ("speed", "<f8"), ("w", "<f8"), ("h", "<f8"),
+                  ("kind", "<i1"), ("power", "<i4"))
+PROJECTILE_COLUMNS = (("x", "<f8"), ("y", "<f8"), ("dx", "<f8"), ("dy", "<f8"))
+PARTICLE_COLUMNS = PROJECTILE_COLUMNS + (("life", "<f8"), ("size", "<i2"), ("color", "<i2"))
+
+
+def _number(value):
+    # Counts and health come back as ints unless they really were fractional
+    return int(value) if float(value).is_integer() else value
+
+
+def _pack_mt(rng):
+    version, words, gauss = rng.getstate()
+    return MT_STATE.pack(*words, float("nan") if gauss is None else gauss)
+
+
+def _unpack_mt(rng, data, at):
+    values = MT_STATE.unpack_from(data, at)
+    gauss = values[-1]
+    rng.setstate((3, values[:-1], None if gauss != gauss else gauss))
+    return at + MT_STATE.size
+
+
+def _pack_pcg(generator):
+    state = generator.bit_generator.state
+    if state["bit_generator"] != "PCG64":
+        raise ValueError(f"cannot snapshot a {state['bit_generator']} generator")
+    mask = (1 << 64) - 1
+    s, inc = state["state"]["state"], state["state"]["inc"]
+    return PCG_STATE.pack(s >> 64, s & mask, inc >> 64, inc & mask, state["has_uint32"], state["uinteger"])
+
+
+def _unpack_pcg(generator, data, at):
+    s_hi, s_lo, inc_hi, inc_lo, has_uint32, uinteger = PCG_STATE.unpack_from(data, at)
+    generator.bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": s_hi << 64 | s_lo, "inc": inc_hi << 64 | inc_lo},
+        "has_uint32": has_uint32,
+        "uinteger": uinteger,
+    }
+    return at + PCG_STATE.size
+
+
+def _pack_rows(parts, pool, columns, rows):
+    for name, dtype in columns:
+        parts.append(getattr(pool, name)[rows].astype(dtype, copy=False).tobytes())
+
+
+def _unpack_rows(pool, columns, rows, count, data, at):
+    for name, dtype in columns:
+        values = np.frombuffer(data, dtype, count, at)
+        getattr(pool, name)[rows] = values
+        at += values.nbytes
+    return at
+
+
+def _resize(pool, names, capacity):
+    # Same capacity as the snapshotted pool, so later growth matches too
+    if pool.capacity != capacity:
+        for name in names:
+            setattr(pool, name, np.zeros(capacity, dtype=getattr(pool, name).dtype))
+        pool.capacity = capacity
+
+
+def snapshot(state):
+    """Pack ``state`` into bytes for ``restore()``."""
+    boss = state.boss
+    player_x, player_y = state.player_pos
+    parts = [
+        HEADER.pack(MAGIC, VERSION, state.sim_hz),
+        GAME.pack(player_x, player_y, state.player_prev_x, state.player_health,
+                  state.player_max_health, state.player_level, state.player_bullet_power,
+                  state.bullet_cooldown, state.bullet_cooldown_max, state.score, state.level,
+                  state.bosses_killed, state.game_over, state.frame,
+                  -1 if state.boss_wave is None else state.boss_wave, state.waves.now, boss is not None),
+    ]
+    if boss is not None:
+        parts.append(BOSS.pack(boss.x, boss.y, boss.size, boss.health, boss.max_health, boss.speed,
+                               boss.direction, boss.attack_timer, boss.attack_delay, boss.phase,
+                               boss.script_pos, boss.spiral_angle, boss.prev_x))
+
+    parts.append(COUNT.pack(len(state.wingmen), 0))
+    for wingman in state.wingmen:
+        parts.append(WINGMAN.pack(wingman.x, wingman.prev_x, wingman.health, wingman.cooldown, wingman.down))
+
+    # Spawn schedule, in heap order
+    queue = state.waves.queue
+    parts.append(COUNT.pack(len(queue), 0))
+    parts.append(np.array([time for time, _ in queue], dtype="<f8").tobytes())
+    parts.append(np.array([i for _, i in queue], dtype="<i4").tobytes())
+
+    parts.append(_pack_mt(state.rng))
+    parts.append(_pack_pcg(state.particles.rng))
+
+    # Slot pools: live slots and their rows, and the free list in order
+    for pool in (state.enemies, state.bullets, state.powerups):
+        live = pool.live()
+        parts.append(COUNT.pack(pool.capacity, len(live)))
+        parts.append(COUNT.pack(len(pool.free), 0))
+        parts.append(np.array(pool.free, dtype="<i4").tobytes())
+        parts.append(live.astype("<i4").tobytes())
+        _pack_rows(parts, pool, ENTITY_COLUMNS, live)
+
+    # Packed pools: the first ``count`` rows
+    for pool, columns in ((state.boss_bullets, PROJECTILE_COLUMNS), (state.particles, PARTICLE_COLUMNS)):
+        parts.append(COUNT.pack(pool.capacity, pool.count))
+        _pack_rows(parts, pool, columns, slice(0, pool.count))
+    return b"".join(parts)
+
+
+def restore(state, data):
+    """Put ``state`` back to how it was when ``data`` was taken.
+
+    Raises ValueError if ``data`` is not a snapshot this version can read,
+    or is cut short; ``state`` is then left half restored.
+    """
+    try:
+        _restore(state, data)
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"truncated or corrupt snapshot ({e})") from e
+
+
+def _restore(state, data):
+    magic, version, sim_hz = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} snapshot")
+    if sim_hz != state.sim_hz:
+        raise ValueError(f"snapshot was taken at {sim_hz} Hz, the game runs at {state.sim_hz} Hz")
+    at = HEADER.size
+
+    (player_x, player_y, state.player_prev_x, health, max_health, player_level, bullet_power,
+     state.bullet_cooldown, state.bullet_cooldown_max, state.score, state.level, state.bosses_killed,
+     state.game_over, state.frame, boss_wave, now, has_boss) = GAME.unpack_from(data, at)
+    at += GAME.size
+    state.player_pos = [player_x, player_y]
+    state.player_health = _number(health)
+    state.player_max_health = _number(max_health)
+    state.player_level = _number(player_level)
+    state.player_bullet_power = _number(bullet_power)
+    state.boss_wave = None if boss_wave < 0 else boss_wave
+    state.events = []
+
+    state.boss = None
+    if has_boss:
+        script = BOSS_SCRIPT if boss_wave < 0 else boss_script(state.wave_events[boss_wave])
+        boss = Boss(state.boss_bullets, script=script)
+        (boss.x, boss.y, boss.size, health, max_health, boss.speed, boss.direction, boss.attack_timer,
+         boss.attack_delay, boss.phase, boss.script_pos, boss.spiral_angle, boss.prev_x) = BOSS.unpack_from(data, at)
+        boss.health, boss.max_health = _number(health), _number(max_health)
+        state.boss = boss
+        at += BOSS.size
+
+    count, _ = COUNT.unpack_from(data, at)
+    at += COUNT.size
+    state.wingmen = []
+    for _ in range(count):
+        x, prev_x, health, cooldown, down = WINGMAN.unpack_from(data, at)
+        wingman = Wingman(x, _number(health))
+        wingman.prev_x, wingman.cooldown, wingman.down = prev_x, cooldown, down
+        state.wingmen.append(wingman)
+        at += WINGMAN.size
+
+    count, _ = COUNT.unpack_from(data, at)
+    at += COUNT.size
+    times = np.frombuffer(data, "<f8", count, at)
+    at += times.nbytes
+    indices = np.frombuffer(data, "<i4", count, at)
+    at += indices.nbytes
+    state.waves.now = now
+    state.waves.queue = list(zip(times.tolist(), indices.tolist()))
+
+    at = _unpack_mt(state.rng, data, at)
+    at = _unpack_pcg(state.particles.rng, data, at)
+
+    for pool in (state.enemies, state.bullets, state.powerups):
+        capacity, live_count = COUNT.unpack_from(data, at)
+        free_count, _ = COUNT.unpack_from(data, at + COUNT.size)
+        at += 2 * COUNT.size
+        _resize(pool, [name for name, _ in ENTITY_COLUMNS] + ["alive"], capacity)
+        free = np.frombuffer(data, "<i4", free_count, at)
+        at += free.nbytes
+        live = np.frombuffer(data, "<i4", live_count, at)
+        at += live.nbytes
+        pool.free = free.tolist()
+        pool.alive[:] = False
+        pool.alive[live] = True
+        at = _unpack_rows(pool, ENTITY_COLUMNS, live, live_count, data, at)
+
+    for pool, columns in ((state.boss_bullets, PROJECTILE_COLUMNS), (state.particles, PARTICLE_COLUMNS)):
+        capacity, count = COUNT.unpack_from(data, at)
+        at += COUNT.size
+        _resize(pool, [name for name, _ in columns], capacity)
+        pool.count = count
+        at = _unpack_rows(pool, columns, slice(0, count), count, data, at)
+
+
+def save_snapshot(path, data):
+    # Written next to the old file and swapped in, so a crash mid-write
+    # leaves the previous save intact
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, path)
+
+
+def load_snapshot(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class SnapshotRing:
+    """The last ``capacity`` snapshots, oldest overwritten first."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.next = 0
+        self.count = 0
+
+    def push(self, state):
+        self.slots[self.next] = snapshot(state)
+        self.next = (self.next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def rewind(self, state, frames):
+        """Restore the snapshot from ``frames`` pushes ago (at most as far as kept).
+
+        The snapshots after it are dropped.  Returns how far it went back,
+        0 if the ring is empty.
+        """
+        frames = min(frames, self.count)
+        if not frames:
+            return 0
+        self.next = (self.next - frames) % self.capacity
+        self.count -= frames
+        restore(state, self.slots[self.next])
+        return frames
+
+    def clear(self):
+        self.slots = [None] * self.capacity
+        self.next = self.count = 0
+
+    def __len__(self):
+        return self.count
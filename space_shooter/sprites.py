@@ -0,0 +1,155 @@
+"""Pre-rendered sprites for every ship, bullet and power-up variant.
+
+Each variant is drawn once into its own transparent ``Surface`` when the
+renderer starts, so drawing an entity is a single blit instead of several
+polygon, circle and rect calls.  A sprite is stored as ``(surface, ox, oy)``:
+the offset of the surface's top-left corner from the entity's position.
+"""
+import pygame
+
+from .core import (
+    WHITE, RED, GREEN, BLUE, YELLOW, PURPLE, ORANGE, CYAN, DARK_RED,
+    player_size, boss_size, ENEMY_FAST, ENEMY_BIG, ENEMY_COLORS, ENEMY_SIZES,
+    BULLET_COLORS, BULLET_SIZES, POWERUP_TYPES, POWERUP_COLORS, powerup_size,
+)
+
+# Ship colour for player levels 1, 2 and 3+
+PLAYER_COLORS = (BLUE, GREEN, PURPLE)
+
+boss_bullet_radius = 8
+
+
+def draw_player_ship(surface, x, y, color):
+    # Draw player as a triangular spaceship
+    size = player_size
+
+    # Main ship body
+    pygame.draw.polygon(surface, color, [
+        (x + size//2, y),              # Nose
+        (x, y + size),                 # Bottom left
+        (x + size, y + size)           # Bottom right
+    ])
+
+    # Cockpit
+    pygame.draw.circle(surface, CYAN, (x + size//2, y + size//3), size//6)
+
+    # Engine glow
+    pygame.draw.polygon(surface, ORANGE, [
+        (x + size//4, y + size),
+        (x + size//2, y + size + 10),
+        (x + 3*size//4, y + size)
+    ])
+
+    # Wings
+    pygame.draw.polygon(surface, color, [
+        (x, y + 2*size//3),
+        (x - size//4, y + size),
+        (x, y + size)
+    ])
+    pygame.draw.polygon(surface, color, [
+        (x + size, y + 2*size//3),
+        (x + size + size//4, y + size),
+        (x + size, y + size)
+    ])
+
+
+def draw_enemy_ship(surface, x, y, kind):
+    # Draw enemy as a triangular spaceship
+    size = ENEMY_SIZES[kind]
+    pygame.draw.polygon(surface, ENEMY_COLORS[kind], [
+        (x + size//2, y),  # Nose
+        (x, y + size),     # Bottom left
+        (x + size, y + size)  # Bottom right
+    ])
+
+    # Add details to the enemy ship
+    if kind == ENEMY_FAST:
+        # Engine glow for fast enemies
+        pygame.draw.polygon(surface, ORANGE, [
+            (x + size//4, y + size),
+            (x + size//2, y + size + 5),
+            (x + 3*size//4, y + size)
+        ])
+    elif kind == ENEMY_BIG:
+        # Cockpit for big enemies
+        pygame.draw.circle(surface, CYAN, (x + size//2, y + size//2), size//4)
+
+
+def draw_boss_ship(surface, x, y):
+    # Draw boss as a large menacing ship
+    size = boss_size
+
+    # Main body
+    pygame.draw.polygon(surface, DARK_RED, [
+        (x + size//2, y),  # Nose
+        (x, y + size),     # Bottom left
+        (x + size, y + size)  # Bottom right
+    ])
+
+    # Details
+    pygame.draw.circle(surface, RED, (x + size//2, y + size//3), size//5)
+    pygame.draw.circle(surface, YELLOW, (x + size//2, y + size//3), size//10)
+
+    # Engines
+    for i in range(3):
+        offset = (i - 1) * size//4
+        pygame.draw.rect(surface, ORANGE, (x + size//2 + offset - 5, y + size, 10, 15))
+
+
+def draw_bullet(surface, x, y, kind):
+    w, h = BULLET_SIZES[kind]
+    pygame.draw.rect(surface, BULLET_COLORS[kind], (x, y, w, h))
+    # Add a glow effect
+    pygame.draw.circle(surface, WHITE, (x + w//2, y + h), 3)
+
+
+def draw_powerup(surface, x, y, kind, font):
+    size = powerup_size
+    pygame.draw.rect(surface, POWERUP_COLORS[kind], (x, y, size, size))
+    # Draw letter indicating type
+    text = font.render(POWERUP_TYPES[kind][0].upper(), True, WHITE)
+    surface.blit(text, (x + size//2 - text.get_width()//2,
+                        y + size//2 - text.get_height()//2))
+
+
+def bake(left, top, right, bottom, draw, *args):
+    # Render ``draw`` into a surface covering the box [left, right] x
+    # [top, bottom] around the entity's origin
+    surface = pygame.Surface((right - left + 1, bottom - top + 1), pygame.SRCALPHA)
+    draw(surface, -left, -top, *args)
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    return surface, left, top
+
+
+class SpriteAtlas:
+    def __init__(self, label_font):
+        s = player_size
+        self.player = [bake(-(s//4), 0, s + s//4, s + 10, draw_player_ship, color)
+                       for color in PLAYER_COLORS]
+
+        self.enemies = [bake(0, 0, ENEMY_SIZES[kind], ENEMY_SIZES[kind] + 5, draw_enemy_ship, kind)
+                        for kind in range(len(ENEMY_SIZES))]
+
+        self.boss = bake(0, 0, boss_size, boss_size + 15, draw_boss_ship)
+
+        self.bullets = []
+        for kind, (w, h) in enumerate(BULLET_SIZES):
+            self.bullets.append(bake(min(0, w//2 - 3), 0, max(w, w//2 + 3), h + 3, draw_bullet, kind))
+
+        r = boss_bullet_radius
+        self.boss_bullet = bake(-r, -r, r, r, lambda surface, x, y: pygame.draw.circle(surface, RED, (x, y), r))
+
+        self.powerups = [bake(0, 0, powerup_size - 1, powerup_size - 1, draw_powerup, kind, label_font)
+                         for kind in range(len(POWERUP_TYPES))]
+
+    def player_sprite(self, player_level):
+        return self.player[min(player_level, len(self.player)) - 1]
+
+    def batch(self, sprites, xs, ys, kinds):
+        # (surface, position) pairs for one Surface.blits call
+        out = []
+        for x, y, kind in zip(xs, ys, kinds):
+            surface, ox, oy = sprites[kind]
+            out.append((surface, (x + ox, y + oy)))
+        return out
@@ -0,0 +1,56 @@
+"""Scrolling parallax starfield.
+
+The stars are drawn once into a few screen-sized layer surfaces, one per
+speed band, with the slowest layer also providing the black background.
+Each frame every layer is blitted twice at its scroll offset so it tiles
+vertically, which costs the same however many stars there are.
+"""
+import random
+
+import pygame
+
+from .core import WHITE, BLACK
+
+
+class Starfield:
+    def __init__(self, width, height, layers=3, density=100, min_speed=0.5, max_speed=1.5, seed=None):
+        # ``density`` is the total number of stars on screen, spread over the
+        # layers; nearer layers scroll faster and have bigger stars
+        self.width = width
+        self.height = height
+        rng = random.Random(seed)
+        self.layers = []
+        for i in range(layers):
+            t = i / (layers - 1) if layers > 1 else 1.0
+            speed = min_speed + (max_speed - min_speed) * t
+            size = 1 + round(2 * t)
+            count = density // layers + (1 if i < density % layers else 0)
+            self.layers.append([self._bake(count, size, i == 0, rng), speed, 0.0])
+
+    def _bake(self, count, size, opaque, rng):
+        surface = pygame.Surface((self.width, self.height))
+        surface.fill(BLACK)
+        for _ in range(count):
+            x = rng.randint(0, self.width)
+            y = rng.randint(0, self.height)
+            # Repeat stars that straddle the top or bottom edge so the seam
+            # between the two tiles doesn't cut them in half
+            for wrap in (-self.height, 0, self.height):
+                pygame.draw.circle(surface, WHITE, (x, y + wrap), size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        if not opaque:
+            surface.set_colorkey(BLACK, pygame.RLEACCEL)
+        return surface
+
+    def update(self, dt=1.0):
+        # dt in 60 Hz frames
+        for layer in self.layers:
+            layer[2] = (layer[2] + layer[1] * dt) % self.height
+
+    def draw(self, screen):
+        # The first layer is opaque and doubles as the screen clear
+        for surface, _, offset in self.layers:
+            y = int(offset)
+            screen.blit(surface, (0, y - self.height))
+            screen.blit(surface, (0, y))
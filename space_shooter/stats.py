@@ -0,0 +1,165 @@
+"""Session log and high-score table, kept in a small SQLite database.
+
+Every finished game is appended to ``sessions``: when and where it was
+played, score, level, bosses beaten, play time and the frame profiler's
+per-phase timings over that game.  Rows are only ever added, so the log of every cabinet
+pointed at the same file (``--stats``) can be read back as one history,
+each row tagged with the cabinet it came from.
+
+``high_scores`` only holds the best ``keep`` games, indexed by score, so
+reading it at startup costs the same however long the log grows.
+
+Writing goes through a queue to a background thread with its own
+connection; ``record()`` only builds the row, so game over never waits on
+the disk.  Like the font cache, the store is optional: if the database
+cannot be opened or written the game carries on without it.
+"""
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+
+STATS_DB = os.path.join(
+    os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "space_shooter", "stats.db",
+)
+
+# How many games the high-score table keeps
+HIGH_SCORES = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    ended REAL NOT NULL,            -- Unix time the game ended
+    cabinet TEXT NOT NULL,
+    seed INTEGER,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    bosses_killed INTEGER NOT NULL,
+    play_time REAL NOT NULL,        -- Seconds of simulated play, pauses excluded
+    frames INTEGER NOT NULL,
+    sim_hz INTEGER NOT NULL,
+    frame_stats TEXT NOT NULL       -- JSON: phase -> {"p50", "p99", "mean"} in ms over the game
+);
+CREATE TABLE IF NOT EXISTS high_scores (
+    score INTEGER NOT NULL,
+    session INTEGER NOT NULL REFERENCES sessions (id)
+);
+CREATE INDEX IF NOT EXISTS high_scores_by_score ON high_scores (score DESC);
+"""
+
+COLUMNS = ("ended", "cabinet", "seed", "score", "level", "bosses_killed",
+           "play_time", "frames", "sim_hz", "frame_stats")
+
+
+def session_row(state, profiler=None, cabinet="", seed=None):
+    """The ``sessions`` row for the game in ``state``, as a dict."""
+    frame_stats = {}
+    if profiler is not None:
+        for name, p50, p99, mean in profiler.game_summary():
+            frame_stats[name] = {"p50": round(p50, 4), "p99": round(p99, 4), "mean": round(mean, 4)}
+    return {
+        "ended": time.time(),
+        "cabinet": cabinet,
+        "seed": seed,
+        "score": state.score,
+        "level": state.level,
+        "bosses_killed": state.bosses_killed,
+        "play_time": state.frame / state.sim_hz,
+        "frames": state.frame,
+        "sim_hz": state.sim_hz,
+        "frame_stats": json.dumps(frame_stats),
+    }
+
+
+def connect(path):
+    # Several cabinets may share one file: wait for their writes to finish
+    connection = sqlite3.connect(path, timeout=10)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class StatsStore:
+    def __init__(self, path=STATS_DB, cabinet=None, keep=HIGH_SCORES):
+        self.path = path
+        self.cabinet = cabinet or socket.gethostname()
+        self.keep = keep
+        self.available = True
+        self.written = 0
+        self.queue = queue.Queue()
+        self.thread = None
+        self.scores = self.read_high_scores()
+
+    def read_high_scores(self):
+        # Best scores first; empty when there is no database yet
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = connect(self.path)
+            try:
+                rows = connection.execute(
+                    "SELECT score FROM high_scores ORDER BY score DESC LIMIT ?", (self.keep,)).fetchall()
+            finally:
+                connection.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Could not open the stats database {self.path} ({e}), not keeping scores.")
+            self.available = False
+            return []
+        return [score for score, in rows]
+
+    def high_score(self):
+        return self.scores[0] if self.scores else 0
+
+    def record(self, state, profiler=None, seed=None):
+        """Queue the finished game in ``state`` for writing and update the scores.
+
+        Returns True if it made the high-score table.
+        """
+        if not self.available:
+            return False
+        self.queue.put(session_row(state, profiler, self.cabinet, seed))
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.write_sessions, name="stats writer", daemon=True)
+            self.thread.start()
+
+        scores = sorted(self.scores + [state.score], reverse=True)[:self.keep]
+        ranked = len(scores) > len(self.scores) or state.score > self.scores[-1]
+        self.scores = scores
+        return ranked
+
+    def write_sessions(self):
+        # Runs on the writer thread until close() queues None
+        connection = None
+        while True:
+            row = self.queue.get()
+            if row is None:
+                break
+            try:
+                if connection is None:
+                    connection = connect(self.path)
+                with connection:
+                    self.write(connection, row)
+                self.written += 1
+            except sqlite3.Error as e:
+                print(f"Could not save the session to {self.path} ({e}).")
+        if connection is not None:
+            connection.close()
+
+    def write(self, connection, row):
+        # One transaction: the session, then the table trimmed to the best ``keep``
+        session = connection.execute(
+            f"INSERT INTO sessions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            [row[name] for name in COLUMNS]).lastrowid
+        connection.execute("INSERT INTO high_scores (score, session) VALUES (?, ?)", (row["score"], session))
+        connection.execute(
+            "DELETE FROM high_scores WHERE rowid NOT IN "
+            "(SELECT rowid FROM high_scores ORDER BY score DESC LIMIT ?)", (self.keep,))
+
+    def close(self, timeout=5):
+        # Let queued sessions finish writing before the game exits
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout)
+            self.thread = None
@@ -0,0 +1,50 @@
+"""Cached text surfaces.
+
+Font rasterisation is one of the most expensive things a frame does, and
+almost every string drawn is the same as last frame.  ``TextCache`` keeps
+rendered surfaces keyed on (font, string, colour) with LRU eviction, and
+``HudText`` is one HUD line that only re-renders when its values change.
+"""
+from collections import OrderedDict
+
+
+class TextCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+
+class HudText:
+    def __init__(self, font, template, color):
+        self.font = font
+        self.template = template
+        self.color = color
+        self.values = None
+        self.surface = None
+
+    def render(self, *values):
+        # Dirty check: only rasterise again when a value actually changed
+        if values != self.values:
+            self.values = values
+            self.surface = self.font.render(self.template.format(*values), True, self.color)
+        return self.surface
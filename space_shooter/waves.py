@@ -0,0 +1,146 @@
+"""Wave definitions and the spawn scheduler that plays them.
+
+A wave file is JSON: ``{"events": [...]}`` where each event says what to
+spawn and when, in 60 Hz frames since the start of the game:
+
+    {"at": 30, "every": 30, "spawn": "enemy"}
+    {"at": 600, "every": 1200, "until": 6000, "spawn": "enemy",
+     "count": 5, "formation": "v", "kind": "fast"}
+    {"at": 1000, "spawn": "boss", "respawn": 1000}
+
+``every`` repeats an event (until ``until``, if given).  A boss event with
+``respawn`` is scheduled again that many frames after its boss is beaten.
+Everything else in an event is read by ``core.spawn_wave()``.
+
+The scheduler keeps the pending events in a heap, so each step only looks
+at the head of the queue instead of ticking a counter per spawner.  Events
+due on the same frame fire in the order they appear in the file.
+"""
+import functools
+import heapq
+import json
+import os
+
+SPAWN_TYPES = ("enemy", "powerup", "boss")
+FORMATIONS = ("line", "v", "column")
+BOSS_PATTERNS = ("spread", "aimed", "spiral")
+
+# Waves played when no file is given, in live play and headless runs alike
+DEFAULT_WAVES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "waves.json")
+
+
+@functools.lru_cache(maxsize=None)
+def load_waves(path=DEFAULT_WAVES):
+    """Read and check a wave file, returning its list of events.
+
+    Each file is only read once; the events are shared and never modified.
+    """
+    with open(path) as f:
+        events = json.load(f)["events"]
+    for i, event in enumerate(events):
+        where = f"{path}: event {i}"
+        if event.get("spawn") not in SPAWN_TYPES:
+            raise ValueError(f"{where}: 'spawn' must be one of {', '.join(SPAWN_TYPES)}")
+        if not _is_number(event.get("at")):
+            raise ValueError(f"{where}: 'at' must be a number of frames")
+        check_number(event, "every", where)
+        check_number(event, "until", where, minimum=None)
+        count = event.get("count", 1)
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            raise ValueError(f"{where}: 'count' must be a whole number of at least 1")
+        if event["spawn"] == "enemy":
+            check_enemy_event(event, where)
+        elif event["spawn"] == "boss":
+            check_boss_event(event, where)
+    return events
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_number(event, name, where, minimum=0):
+    # An optional field that must be a number, above ``minimum`` unless None
+    if name not in event:
+        return
+    value = event[name]
+    if not _is_number(value):
+        raise ValueError(f"{where}: '{name}' must be a number")
+    if minimum is not None and value <= minimum:
+        raise ValueError(f"{where}: '{name}' must be more than {minimum}")
+
+
+def check_boss_event(event, where):
+    check_number(event, "health", where)
+    check_number(event, "respawn", where)
+    # Phases of [pattern, frames until the next attack] steps, see
+    # core.Boss.attack(); an empty or missing script means the default one
+    script = event.get("script") or []
+    if not isinstance(script, list):
+        raise ValueError(f"{where}: 'script' must be a list of phases")
+    for p, phase in enumerate(script):
+        if not isinstance(phase, list) or not phase:
+            raise ValueError(f"{where}: script phase {p} must be a non-empty list of [pattern, delay] steps")
+        for attack in phase:
+            if not (isinstance(attack, list) and len(attack) == 2 and attack[0] in BOSS_PATTERNS
+                    and _is_number(attack[1]) and attack[1] > 0):
+                raise ValueError(f"{where}: script phase {p} step {attack!r} must be [pattern, delay] "
+                                 f"with pattern one of {', '.join(BOSS_PATTERNS)} and delay more than 0")
+
+
+def check_enemy_event(event, where):
+    # Catch what would only fail once the event comes up mid-game
+    from .core import ENEMY_SIZES, ENEMY_TYPES, WIDTH, formation_spacing  # core imports this module
+
+    if event.get("formation", "line") not in FORMATIONS:
+        raise ValueError(f"{where}: 'formation' must be one of {', '.join(FORMATIONS)}")
+    check_number(event, "speed", where)
+    check_number(event, "spacing", where, minimum=None)
+    count = event.get("count", 1)
+    kind = event.get("kind", "normal")
+    if kind not in ENEMY_TYPES:
+        raise ValueError(f"{where}: 'kind' must be one of {', '.join(ENEMY_TYPES)}")
+    formation = event.get("formation")
+    if formation is None:
+        return
+    # The same geometry as core.spawn_wave(): members spread around x
+    size = ENEMY_SIZES[ENEMY_TYPES.index(kind)]
+    spacing = abs(event.get("spacing", formation_spacing))
+    half = 0 if formation == "column" else int((count - 1) / 2 * spacing)
+    if 2 * half + size > WIDTH:
+        raise ValueError(f"{where}: the formation is {2 * half + size} pixels wide, "
+                         f"more than the screen's {WIDTH}")
+    x = event.get("x")
+    if x is not None and not (isinstance(x, (int, float)) and half <= x <= WIDTH - size - half):
+        raise ValueError(f"{where}: 'x' must be between {half} and {WIDTH - size - half} "
+                         f"for the formation to fit on screen")
+
+
+class WaveScheduler:
+    def __init__(self, events):
+        self.events = events
+        self.now = 0.0
+        # (due time, index in the file): the index breaks ties in file order
+        self.queue = [(event["at"], i) for i, event in enumerate(events)]
+        heapq.heapify(self.queue)
+
+    def advance(self, dt):
+        """Move the clock on by ``dt`` frames and return the events now due."""
+        self.now += dt
+        due = []
+        queue = self.queue
+        while queue and queue[0][0] <= self.now:
+            time, i = heapq.heappop(queue)
+            event = self.events[i]
+            every = event.get("every")
+            if every and time + every <= event.get("until", float("inf")):
+                heapq.heappush(queue, (time + every, i))
+            due.append(i)
+        return due
+
+    def schedule(self, i, delay):
+        # Run event ``i`` again ``delay`` frames from now
+        heapq.heappush(self.queue, (self.now + delay, i))
+
+    def __len__(self):
+        return len(self.queue)